@@ -0,0 +1,172 @@
+"""Task analytics benchmark: completion rollups versus aggregating raw tasks.
+
+Seeds a temporary database with one user holding --tasks tasks created over
+--days days, about half of them completed, and builds the completion
+rollups. It then times the same date-range summaries (completions per day
+and per week by priority, with average time to completion) computed three
+ways: from the rollup table, by grouping the raw tasks, and by grouping the
+raw tasks with an index on (user_id, completed_at). Finally it times task
+status updates with and without the rollup maintenance, to show what keeping
+the rollups current costs each write.
+
+    cd backend
+    python benchmarks/analytics_bench.py --tasks 100000 --days 730
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from api_bench import load_app
+
+
+def seed(app, tasks, days, rng):
+    from flask_jwt_extended import create_access_token
+    from database import db
+    from models.task import Task
+    from models.user import User
+    from services.task_analytics import rebuild_task_analytics
+    from services.task_stats import rebuild_task_stats
+
+    with app.app_context():
+        db.create_all()
+        user_id = str(uuid.uuid4())
+        db.session.execute(User.__table__.insert(), [{
+            'id': user_id, 'username': 'analytics', 'email': 'analytics@example.com',
+            'password_hash': 'x', 'first_name': 'Bench', 'last_name': 'User', 'is_active': True,
+        }])
+        now = datetime.utcnow()
+        rows = []
+        for _ in range(tasks):
+            created_at = now - timedelta(minutes=rng.randrange(0, days * 1440))
+            completed = rng.random() < 0.5
+            rows.append({
+                'id': str(uuid.uuid4()),
+                'user_id': user_id,
+                'title': 'analytics bench',
+                'priority': rng.choice(['low', 'medium', 'high']),
+                'status': 'completed' if completed else 'pending',
+                'completed_at': min(now, created_at + timedelta(minutes=rng.randrange(1, 20000))) if completed else None,
+                'created_at': created_at,
+                'updated_at': created_at,
+            })
+        db.session.execute(Task.__table__.insert(), rows)
+        db.session.commit()
+        with db.engine.begin() as connection:
+            rebuild_task_stats(connection)
+            rebuild_task_analytics(connection)
+            connection.exec_driver_sql('ANALYZE')
+        task_ids = [row['id'] for row in rows[:1000]]
+        return user_id, create_access_token(identity=user_id), task_ids
+
+
+def raw_query(user_id, start, end, interval):
+    """The same summary grouped straight from the tasks table."""
+    from sqlalchemy import func, literal_column, select
+    from models.task import Task
+
+    day = func.date(Task.completed_at)
+    period = func.date(day, literal_column("'weekday 0'"), literal_column("'-6 days'")) if interval == 'week' else day
+    seconds = func.coalesce(func.strftime('%s', Task.completed_at) - func.strftime('%s', Task.created_at), 0)
+    return select(
+        period.label('period'), Task.priority, func.count(), func.sum(seconds)
+    ).where(
+        Task.user_id == user_id,
+        Task.completed_at >= datetime.combine(start, datetime.min.time()),
+        Task.completed_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
+    ).group_by(period, Task.priority).order_by(period)
+
+
+def time_query(statement, repeat):
+    from database import db
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        rows = db.session.execute(statement).all()
+        timings.append(time.perf_counter() - began)
+    # Rollup days come back as dates, raw ones as strings
+    rows = [(str(period), *rest) for period, *rest in rows]
+    return round(min(timings) * 1000, 3), rows
+
+
+def time_updates(client, token, task_ids, count):
+    headers = {'Authorization': f'Bearer {token}'}
+    began = time.perf_counter()
+    for index in range(count):
+        status = 'completed' if index % 2 == 0 else 'pending'
+        client.put(f'/api/tasks/{task_ids[index % len(task_ids)]}', json={'status': status}, headers=headers)
+    return round((time.perf_counter() - began) / count * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=100000, help='tasks of the one seeded user')
+    parser.add_argument('--days', type=int, default=730, help='days over which the tasks were created')
+    parser.add_argument('--range-days', type=int, default=365, help='length of the queried date range')
+    parser.add_argument('--repeat', type=int, default=20, help='runs per query; the fastest is reported')
+    parser.add_argument('--updates', type=int, default=2000, help='status updates timed per configuration')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = load_app(os.path.join(directory, 'bench.db'))
+        user_id, token, task_ids = seed(app, args.tasks, args.days, random.Random(args.seed))
+
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+        from database import db
+        from services import task_analytics
+
+        end = datetime.utcnow().date()
+        start = end - timedelta(days=args.range_days - 1)
+        queries = {}
+        with app.app_context():
+            for interval in task_analytics.INTERVALS:
+                queries[f'rollup by {interval}'] = time_query(
+                    task_analytics.completion_query(user_id, start, end, interval), args.repeat)
+                queries[f'raw tasks by {interval}'] = time_query(raw_query(user_id, start, end, interval), args.repeat)
+            db.session.execute(db.text('CREATE INDEX bench_tasks_user_completed ON tasks (user_id, completed_at)'))
+            db.session.commit()
+            for interval in task_analytics.INTERVALS:
+                queries[f'raw tasks by {interval}, indexed'] = time_query(
+                    raw_query(user_id, start, end, interval), args.repeat)
+            db.session.execute(db.text('DROP INDEX bench_tasks_user_completed'))
+            db.session.commit()
+
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        url = f'/api/tasks/analytics?from={start}&to={end}&interval=week'
+        client.get(url, headers=headers)
+        began = time.perf_counter()
+        for _ in range(args.repeat):
+            client.get(url, headers=headers)
+        endpoint_ms = round((time.perf_counter() - began) / args.repeat * 1000, 3)
+
+        time_updates(client, token, task_ids, 200)
+        with_rollups = time_updates(client, token, task_ids, args.updates)
+        event.remove(Session, 'after_flush', task_analytics._maintain_task_rollups)
+        without_rollups = time_updates(client, token, task_ids, args.updates)
+        event.listen(Session, 'after_flush', task_analytics._maintain_task_rollups)
+
+    report = {
+        'dataset': {'tasks': args.tasks, 'days': args.days, 'rangeDays': args.range_days},
+        'queries_ms': {name: timing for name, (timing, _) in queries.items()},
+        'rows': {name: len(rows) for name, (_, rows) in queries.items()},
+        'resultsMatch': all(
+            queries[f'rollup by {interval}'][1] == queries[f'raw tasks by {interval}'][1]
+            for interval in ('day', 'week')
+        ),
+        'endpoint_ms': endpoint_ms,
+        'statusUpdate_us': {'withRollups': with_rollups, 'withoutRollups': without_rollups},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+"""Load and latency benchmark for the task management API.
+
+Seeds a temporary SQLite database with N users holding a skewed number of
+tasks each, then drives every auth and task endpoint either through the
+Flask test client (in process) or through a real gunicorn server, at a
+configurable concurrency. Prints a JSON report with throughput and
+p50/p95/p99 latency per endpoint, and can compare it against a stored
+baseline report.
+
+    cd backend
+    python benchmarks/api_bench.py --users 50 --tasks 200 --requests 200 --output report.json
+    python benchmarks/api_bench.py --target gunicorn --workers 4 --concurrency 16
+    python benchmarks/api_bench.py --baseline report.json --tolerance 0.2
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+PASSWORD = 'Benchmark1'
+WORDS = ['report', 'review', 'deploy', 'invoice', 'meeting', 'design', 'budget',
+         'release', 'customer', 'migration', 'roadmap', 'hiring', 'audit', 'backlog']
+
+
+def load_app(database_path):
+    os.environ['DATABASE_PATH'] = database_path
+    os.environ['JWT_SECRET'] = os.environ.get('JWT_SECRET') or 'benchmark-secret-key-with-enough-bytes'
+    sys.path.insert(0, SRC)
+    from app import app
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Dataset
+# ---------------------------------------------------------------------------
+
+def task_counts(users, tasks_per_user, skew):
+    """Split users * tasks_per_user tasks across users following a Zipf curve."""
+    weights = [1 / (rank + 1) ** skew for rank in range(users)]
+    total = users * tasks_per_user
+    return [max(1, round(total * weight / sum(weights))) for weight in weights]
+
+
+def seed(app, users, tasks_per_user, skew, rng):
+    from flask_jwt_extended import create_access_token
+    from werkzeug.security import generate_password_hash
+    from database import db
+    from models.task import Task
+    from models.user import User
+    from services.task_stats import rebuild_task_stats
+
+    with app.app_context():
+        db.create_all()
+        password_hash = generate_password_hash(PASSWORD, app.config['PASSWORD_HASH_METHOD'])
+        now = datetime.utcnow()
+        accounts = []
+
+        for index, count in enumerate(task_counts(users, tasks_per_user, skew)):
+            user_id = str(uuid.uuid4())
+            db.session.execute(User.__table__.insert(), [{
+                'id': user_id,
+                'username': f'bench_{index}',
+                'email': f'bench_{index}@example.com',
+                'password_hash': password_hash,
+                'first_name': 'Bench',
+                'last_name': str(index),
+                'is_active': True,
+            }])
+            rows = []
+            for _ in range(count):
+                created_at = now - timedelta(minutes=rng.randrange(0, 525600))
+                rows.append({
+                    'user_id': user_id,
+                    'title': ' '.join(rng.sample(WORDS, 3)),
+                    'description': ' '.join(rng.choices(WORDS, k=rng.randrange(0, 40))) or None,
+                    'priority': rng.choice(['low', 'medium', 'high']),
+                    'status': rng.choice(['pending', 'in-progress', 'completed']),
+                    'due_date': created_at + timedelta(days=rng.randrange(1, 60)) if rng.random() < 0.5 else None,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                })
+            db.session.execute(Task.__table__.insert(), rows)
+            db.session.commit()
+
+            task_ids = [task_id for task_id, in db.session.execute(
+                db.select(Task.id).where(Task.user_id == user_id).limit(500))]
+            accounts.append({
+                'index': index,
+                'email': f'bench_{index}@example.com',
+                'token': create_access_token(identity=user_id),
+                'tasks': count,
+                'task_ids': task_ids,
+            })
+
+        with db.engine.begin() as connection:
+            rebuild_task_stats(connection)
+    return accounts
+
+
+# ---------------------------------------------------------------------------
+# Transports
+# ---------------------------------------------------------------------------
+
+class TestClientTransport:
+    """Calls the app in process, one Flask test client per thread."""
+
+    name = 'testclient'
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, headers, body=None):
+        if not hasattr(self.local, 'client'):
+            self.local.client = self.app.test_client()
+        response = self.local.client.open(path, method=method, headers=headers, data=body)
+        data = response.get_data()
+        return response.status_code, data
+
+    def close(self):
+        pass
+
+
+class HttpTransport:
+    """Talks HTTP to a gunicorn server, one keep-alive connection per thread."""
+
+    name = 'gunicorn'
+
+    def __init__(self, database_path, workers, threads):
+        self.port = free_port()
+        env = dict(os.environ, DATABASE_PATH=database_path)
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--chdir', SRC, '-w', str(workers),
+             '-k', 'gthread', '--threads', str(threads), '-b', f'127.0.0.1:{self.port}',
+             '--log-level', 'warning', 'app:app'],
+            env=env
+        )
+        self.local = threading.local()
+        wait_for_port(self.port, self.process)
+
+    def request(self, method, path, headers, body=None):
+        if not hasattr(self.local, 'connection'):
+            self.local.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        if isinstance(body, str):
+            body = body.encode()
+        try:
+            self.local.connection.request(method, path, body=body, headers=headers)
+            response = self.local.connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            self.local.connection.close()
+            del self.local.connection
+            return 599, b''
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('gunicorn did not start listening in time')
+
+
+# ---------------------------------------------------------------------------
+# Workload
+# ---------------------------------------------------------------------------
+
+def auth(account):
+    return {'Authorization': f"Bearer {account['token']}", 'Content-Type': 'application/json'}
+
+
+def build_scenarios(accounts, rng):
+    """Return (endpoint name, function returning a request tuple) pairs."""
+    created = []
+    created_lock = threading.Lock()
+    counter = iter(range(10 ** 9))
+    # Large accounts are hit more often, like real users with long histories
+    weights = [account['tasks'] for account in accounts]
+
+    def pick():
+        return rng.choices(accounts, weights=weights)[0]
+
+    def some_task(account):
+        return rng.choice(account['task_ids'])
+
+    def remember(status, data):
+        if status == 201:
+            with created_lock:
+                created.append(json.loads(data)['data']['task']['id'])
+
+    def take_created():
+        with created_lock:
+            return created.pop() if created else None
+
+    def delete_request():
+        account = accounts[0]
+        task_id = take_created() or some_task(account)
+        return 'DELETE', f'/api/tasks/{task_id}', auth(account), None
+
+    return [
+        ('GET /api/tasks (page)', lambda: ('GET', f'/api/tasks/?page={rng.randrange(1, 6)}&limit=20', auth(pick()), None)),
+        ('GET /api/tasks (cursor)', lambda: ('GET', '/api/tasks/?cursor=&limit=20', auth(pick()), None)),
+        ('GET /api/tasks (filtered)', lambda: ('GET', '/api/tasks/?status=pending&priority=high&limit=20', auth(pick()), None)),
+        ('GET /api/tasks (search)', lambda: ('GET', f'/api/tasks/?search={rng.choice(WORDS)}&limit=20', auth(pick()), None)),
+        ('GET /api/tasks/<id>', lambda: (lambda account: ('GET', f'/api/tasks/{some_task(account)}', auth(account), None))(pick())),
+        ('GET /api/tasks/due', lambda: ('GET', '/api/tasks/due?days=14', auth(pick()), None)),
+        ('GET /api/tasks/changes', lambda: ('GET', '/api/tasks/changes?limit=100', auth(pick()), None)),
+        ('GET /api/tasks/stats', lambda: ('GET', '/api/tasks/stats', auth(pick()), None)),
+        ('GET /api/tasks/export', lambda: ('GET', '/api/tasks/export?format=ndjson', auth(accounts[-1]), None)),
+        ('GET /api/auth/profile', lambda: ('GET', '/api/auth/profile', auth(pick()), None)),
+        ('POST /api/tasks', lambda: ('POST', '/api/tasks/', auth(accounts[0]),
+                                     json.dumps({'title': f'bench {next(counter)}', 'priority': 'high'})), remember),
+        ('PUT /api/tasks/<id>', lambda: (lambda account: ('PUT', f'/api/tasks/{some_task(account)}', auth(account),
+                                                          json.dumps({'status': rng.choice(['pending', 'completed'])})))(pick())),
+        ('DELETE /api/tasks/<id>', delete_request),
+        ('POST /api/tasks/batch', lambda: ('POST', '/api/tasks/batch', auth(accounts[0]), json.dumps({'operations': [
+            {'op': 'create', 'data': {'title': f'batch {next(counter)}'}} for _ in range(20)]}))),
+        ('POST /api/tasks/import', lambda: ('POST', '/api/tasks/import', {**auth(accounts[0]), 'Content-Type': 'application/x-ndjson'},
+                                            '\n'.join(json.dumps({'title': f'import {next(counter)}'}) for _ in range(50)))),
+        ('POST /api/auth/login', lambda: ('POST', '/api/auth/login', {'Content-Type': 'application/json'},
+                                          json.dumps({'email': pick()['email'], 'password': PASSWORD}))),
+        ('POST /api/auth/register', lambda: (lambda n: ('POST', '/api/auth/register', {'Content-Type': 'application/json'}, json.dumps({
+            'username': f'new_{n}', 'email': f'new_{n}@example.com', 'password': PASSWORD,
+            'first_name': 'New', 'last_name': 'User'})))(next(counter))),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_endpoint(transport, scenario, requests, concurrency):
+    name, make_request, *callback = scenario
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        method, path, headers, body = make_request()
+        began = time.perf_counter()
+        status, data = transport.request(method, path, headers, body)
+        elapsed = time.perf_counter() - began
+        if callback:
+            callback[0](status, data)
+        with lock:
+            latencies.append(elapsed)
+            if status >= 400:
+                errors += 1
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - began
+
+    latencies.sort()
+    return name, {
+        'requests': requests,
+        'errors': errors,
+        'throughput': round(requests / wall, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+def compare(report, baseline, tolerance):
+    """List endpoints whose p95 latency or throughput regressed beyond tolerance."""
+    regressions = []
+    for name, current in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+        if current['throughput'] < previous['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput']} -> {current['throughput']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--tasks', type=int, default=200, help='average tasks per user')
+    parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent for task counts (0 = even)')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--target', choices=['testclient', 'gunicorn'], default='testclient')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--endpoints', nargs='*', help='only run endpoints whose name contains one of these')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='compare against a previous JSON report')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, 'bench.db')
+        app = load_app(database_path)
+        accounts = seed(app, args.users, args.tasks, args.skew, rng)
+
+        transport = (HttpTransport(database_path, args.workers, args.threads)
+                     if args.target == 'gunicorn' else TestClientTransport(app))
+        try:
+            scenarios = [scenario for scenario in build_scenarios(accounts, rng)
+                         if not args.endpoints or any(part in scenario[0] for part in args.endpoints)]
+            results = dict(run_endpoint(transport, scenario, args.requests, args.concurrency)
+                           for scenario in scenarios)
+        finally:
+            transport.close()
+
+    report = {
+        'target': args.target,
+        'dataset': {'users': args.users, 'tasksPerUser': args.tasks, 'skew': args.skew, 'seed': args.seed},
+        'requestsPerEndpoint': args.requests,
+        'concurrency': args.concurrency,
+        'endpoints': results,
+    }
+    if args.target == 'gunicorn':
+        report['server'] = {'workers': args.workers, 'threads': args.threads}
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
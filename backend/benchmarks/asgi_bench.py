@@ -0,0 +1,217 @@
+"""Side-by-side benchmark of the sync (gunicorn) and ASGI (uvicorn) servers.
+
+Seeds one temporary database with the api_bench dataset, then starts each
+server in turn on it and holds --connections keep-alive connections open at
+once. Each connection sends requests from a read-heavy mix of the auth and
+task endpoints, pausing --think-ms between requests like an idle client, for
+--duration seconds. Prints a JSON report with throughput, error count,
+p50/p95/p99 latency and the server's memory and thread count under load.
+
+    cd backend
+    python benchmarks/asgi_bench.py --connections 1000 --think-ms 500
+    python benchmarks/asgi_bench.py --servers uvicorn --connections 2000 --uvicorn-workers 2
+
+The ASGI server needs `pip install -r requirements-asgi.txt`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from api_bench import SRC, free_port, load_app, percentile, seed, wait_for_port
+
+
+def start_server(kind, database_path, port, args):
+    env = dict(os.environ, DATABASE_PATH=database_path)
+    if kind == 'gunicorn':
+        command = ['gunicorn', '--chdir', SRC, '-w', str(args.workers), '-k', 'gthread',
+                   '--threads', str(args.threads), '--worker-connections', str(args.connections * 2),
+                   '--keep-alive', str(args.keep_alive), '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'app:app']
+    else:
+        command = ['uvicorn', '--app-dir', SRC, '--workers', str(args.uvicorn_workers),
+                   '--port', str(port), '--timeout-keep-alive', str(args.keep_alive), '--log-level', 'warning', '--no-access-log', 'asgi:app']
+    process = subprocess.Popen([sys.executable, '-m', *command], env=env)
+    wait_for_port(port, process)
+    return process
+
+
+def server_memory(pid):
+    """Resident memory in MB and thread count of a server process and its workers (Linux only)."""
+    pids, rss, threads = [pid], 0, 0
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f'/proc/{current}/status') as handle:
+                status = dict(line.split(':', 1) for line in handle if ':' in line)
+            with open(f'/proc/{current}/task/{current}/children') as handle:
+                pids.extend(int(child) for child in handle.read().split())
+        except OSError:
+            continue
+        rss += int(status['VmRSS'].split()[0])
+        threads += int(status['Threads'])
+    return round(rss / 1024, 1), threads
+
+
+def build_requests(accounts, rng):
+    """Return a function producing (method, path, headers, body) for the next request."""
+    weights = [account['tasks'] for account in accounts]
+    counter = iter(range(10 ** 9))
+
+    def next_request():
+        account = rng.choices(accounts, weights=weights)[0]
+        headers = {'Authorization': f"Bearer {account['token']}"}
+        roll = rng.random()
+        if roll < 0.35:
+            return 'GET', f'/api/tasks/?page={rng.randrange(1, 4)}&limit=20', headers, None
+        if roll < 0.55:
+            return 'GET', f"/api/tasks/{rng.choice(account['task_ids'])}", headers, None
+        if roll < 0.70:
+            return 'GET', '/api/tasks/stats', headers, None
+        if roll < 0.85:
+            return 'GET', '/api/auth/profile', headers, None
+        if roll < 0.95:
+            return 'PUT', f"/api/tasks/{rng.choice(account['task_ids'])}", headers, json.dumps(
+                {'status': rng.choice(['pending', 'in-progress', 'completed'])})
+        return 'POST', '/api/tasks/', headers, json.dumps({'title': f'asgi bench {next(counter)}'})
+
+    return next_request
+
+
+async def send_request(reader, writer, method, path, headers, body):
+    body = body.encode() if body else b''
+    lines = [f'{method} {path} HTTP/1.1', 'Host: 127.0.0.1', f'Content-Length: {len(body)}']
+    if body:
+        lines.append('Content-Type: application/json')
+    lines.extend(f'{name}: {value}' for name, value in headers.items())
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def run_load(port, pid, next_request, args):
+    latencies = []
+    counts = {'errors': 0, 'failed_connections': 0}
+    deadline = time.monotonic() + args.duration
+
+    async def client(index):
+        # Spread connection setup and the first requests over the ramp-up
+        await asyncio.sleep(args.ramp * index / args.connections)
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        except OSError:
+            counts['failed_connections'] += 1
+            return
+        try:
+            while time.monotonic() < deadline:
+                if reader.at_eof():
+                    # The server closed the idle connection; open a new one
+                    writer.close()
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                began = time.perf_counter()
+                status = await asyncio.wait_for(send_request(reader, writer, *next_request()), args.timeout)
+                latencies.append(time.perf_counter() - began)
+                if status >= 400:
+                    counts['errors'] += 1
+                if args.think_ms:
+                    await asyncio.sleep(args.think_ms / 1000)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            counts['errors'] += 1
+        finally:
+            writer.close()
+
+    async def sample_memory():
+        # Sample once every connection is open and busy
+        await asyncio.sleep(args.ramp + min(args.duration / 2, 10))
+        return server_memory(pid)
+
+    began = time.monotonic()
+    sampler = asyncio.ensure_future(sample_memory())
+    await asyncio.gather(*(client(index) for index in range(args.connections)))
+    wall = time.monotonic() - began
+    rss_mb, threads = await sampler
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': counts['errors'],
+        'failedConnections': counts['failed_connections'],
+        'throughput': round(len(latencies) / wall, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        'serverRssMb': rss_mb,
+        'serverThreads': threads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=200, help='average tasks per user')
+    parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent for task counts (0 = even)')
+    parser.add_argument('--servers', nargs='+', choices=['gunicorn', 'uvicorn'], default=['gunicorn', 'uvicorn'])
+    parser.add_argument('--connections', type=int, default=500, help='keep-alive connections held open at once')
+    parser.add_argument('--think-ms', type=float, default=200, help='pause between requests on a connection')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of load per server')
+    parser.add_argument('--ramp', type=float, default=2, help='seconds over which connections are opened')
+    parser.add_argument('--timeout', type=float, default=30, help='seconds before a request counts as failed')
+    parser.add_argument('--keep-alive', type=int, default=75, help='seconds both servers keep idle connections open')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=16, help='gunicorn threads per worker')
+    parser.add_argument('--uvicorn-workers', type=int, default=1, help='uvicorn worker processes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, 'bench.db')
+        accounts = seed(load_app(database_path), args.users, args.tasks, args.skew, rng)
+
+        for kind in args.servers:
+            port = free_port()
+            process = start_server(kind, database_path, port, args)
+            try:
+                next_request = build_requests(accounts, random.Random(args.seed))
+                results[kind] = asyncio.run(run_load(port, process.pid, next_request, args))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    report = {
+        'dataset': {'users': args.users, 'tasksPerUser': args.tasks, 'skew': args.skew, 'seed': args.seed},
+        'load': {'connections': args.connections, 'thinkMs': args.think_ms, 'duration': args.duration,
+                 'keepAlive': args.keep_alive},
+        'servers': {
+            'gunicorn': {'workers': args.workers, 'threads': args.threads},
+            'uvicorn': {'workers': args.uvicorn_workers},
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark of primary key storage: text vs 16-byte blob, UUIDv4 vs UUIDv7.
+
+For each combination, inserts tasks in committed batches into a fresh
+SQLite file and reports insert throughput, primary-key lookup time and
+the on-disk size of the tasks table and each of its indexes (from the
+dbstat virtual table).
+
+    cd backend
+    python benchmarks/key_storage_bench.py --tasks 200000 --batch 100
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+VARIANTS = [('text', 4), ('text', 7), ('blob', 4), ('blob', 7)]
+
+
+def load_app(database_path, storage, profile):
+    os.environ['DATABASE_PATH'] = database_path
+    os.environ['KEY_STORAGE'] = storage
+    os.environ['SQLITE_PROFILE'] = profile
+    os.environ['JWT_SECRET'] = os.environ.get('JWT_SECRET') or 'benchmark-secret-key-with-enough-bytes'
+    sys.path.insert(0, SRC)
+    from app import app
+    return app
+
+
+def run_variant(storage, version, args, results):
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, 'bench.db')
+        app = load_app(database_path, storage, args.profile)
+        from database import db
+        from models.keys import uuid7
+        from models.task import Task
+        from models.user import User
+
+        make_id = (lambda: str(uuid7())) if version == 7 else (lambda: str(uuid.uuid4()))
+        rng = random.Random(args.seed)
+
+        with app.app_context():
+            db.create_all()
+            user_ids = [make_id() for _ in range(args.users)]
+            db.session.execute(User.__table__.insert(), [{
+                'id': user_id, 'username': f'bench_{n}', 'email': f'bench_{n}@example.com',
+                'password_hash': 'x', 'first_name': 'Bench', 'last_name': str(n), 'is_active': True,
+            } for n, user_id in enumerate(user_ids)])
+            db.session.commit()
+
+            now = datetime.utcnow()
+            task_ids = []
+            began = time.perf_counter()
+            for offset in range(0, args.tasks, args.batch):
+                rows = []
+                for n in range(offset, min(offset + args.batch, args.tasks)):
+                    task_id = make_id()
+                    task_ids.append(task_id)
+                    rows.append({
+                        'id': task_id, 'user_id': rng.choice(user_ids), 'title': f'task {n}',
+                        'priority': 'medium', 'status': 'pending',
+                        'created_at': now + timedelta(milliseconds=n), 'updated_at': now,
+                    })
+                db.session.execute(Task.__table__.insert(), rows)
+                db.session.commit()
+            insert_seconds = time.perf_counter() - began
+
+            sample = rng.sample(task_ids, min(args.lookups, len(task_ids)))
+            began = time.perf_counter()
+            for task_id in sample:
+                db.session.get(Task, task_id)
+                db.session.expunge_all()
+            lookup_seconds = time.perf_counter() - began
+
+            sizes = dict(db.session.execute(db.text(
+                "SELECT d.name, SUM(d.pgsize) FROM dbstat d JOIN sqlite_master m ON m.name = d.name "
+                "WHERE m.tbl_name = 'tasks' AND m.type IN ('table', 'index') GROUP BY d.name"
+            )).all())
+
+        results.put({
+            'storage': storage,
+            'uuid': f'v{version}',
+            'insertsPerSecond': round(args.tasks / insert_seconds),
+            'lookupMicroseconds': round(lookup_seconds / len(sample) * 1e6, 1),
+            'bytes': sizes,
+            'fileBytes': os.path.getsize(database_path),
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--batch', type=int, default=100, help='rows per committed transaction')
+    parser.add_argument('--lookups', type=int, default=5000)
+    parser.add_argument('--profile', default='production', help='SQLITE_PROFILE to run with')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    # KEY_STORAGE is read when the models are imported, so each variant gets its own process
+    context = multiprocessing.get_context('spawn')
+    report = []
+    for storage, version in VARIANTS:
+        results = context.Queue()
+        process = context.Process(target=run_variant, args=(storage, version, args, results))
+        process.start()
+        report.append(results.get(timeout=3600))
+        process.join()
+
+    print(json.dumps({'tasks': args.tasks, 'users': args.users, 'batch': args.batch, 'results': report}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
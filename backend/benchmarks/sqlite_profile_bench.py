@@ -0,0 +1,116 @@
+"""Write-heavy benchmark comparing SQLite engine profiles.
+
+Starts several worker processes (standing in for gunicorn workers), each
+creating tasks through the Flask test client against one shared SQLite
+file, and reports committed writes per second and failed requests for
+each SQLITE_PROFILE.
+
+    cd backend
+    python benchmarks/sqlite_profile_bench.py --workers 4 --writes 500
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+def load_app(database_path, profile):
+    os.environ['DATABASE_PATH'] = database_path
+    os.environ['SQLITE_PROFILE'] = profile
+    os.environ['JWT_SECRET'] = os.environ.get('JWT_SECRET') or 'benchmark-secret-key-with-enough-bytes'
+    sys.path.insert(0, SRC)
+    from app import app
+    return app
+
+
+def register(client, index):
+    response = client.post('/api/auth/register', json={
+        'username': f'bench_{index}',
+        'email': f'bench_{index}@example.com',
+        'password': 'Benchmark1',
+        'first_name': 'Bench',
+        'last_name': str(index),
+    })
+    return response.json['data']['token']
+
+
+def create_schema(database_path, profile):
+    app = load_app(database_path, profile)
+    from database import db
+    with app.app_context():
+        db.create_all()
+
+
+def worker(database_path, profile, index, writes, start, results):
+    try:
+        app = load_app(database_path, profile)
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {register(client, index)}'}
+    finally:
+        start.wait()
+
+    ok = failed = 0
+    began = time.perf_counter()
+    for n in range(writes):
+        response = client.post('/api/tasks/', json={'title': f'task {n}', 'priority': 'high'}, headers=headers)
+        if response.status_code == 201:
+            ok += 1
+        else:
+            failed += 1
+    results.put((ok, failed, time.perf_counter() - began))
+
+
+def run(profile, workers, writes):
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, 'bench.db')
+        # Each run gets fresh processes so the app binds to this run's database
+        context = multiprocessing.get_context('spawn')
+        setup = context.Process(target=create_schema, args=(database_path, profile))
+        setup.start()
+        setup.join()
+
+        start = context.Barrier(workers + 1)
+        results = context.Queue()
+        processes = [
+            context.Process(target=worker, args=(database_path, profile, index, writes, start, results))
+            for index in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        start.wait()
+        began = time.perf_counter()
+        outcomes = [results.get(timeout=600) for _ in processes]
+        elapsed = time.perf_counter() - began
+        for process in processes:
+            process.join()
+
+    committed = sum(ok for ok, _, _ in outcomes)
+    return {
+        'profile': profile,
+        'workers': workers,
+        'writesPerWorker': writes,
+        'committed': committed,
+        'failed': sum(failed for _, failed, _ in outcomes),
+        'seconds': round(elapsed, 3),
+        'writesPerSecond': round(committed / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--writes', type=int, default=500, help='task creations per worker')
+    parser.add_argument('--profiles', nargs='+', default=['default', 'production'])
+    args = parser.parse_args()
+
+    report = [run(profile, args.workers, args.writes) for profile in args.profiles]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
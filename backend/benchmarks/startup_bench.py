@@ -0,0 +1,91 @@
+"""Cold start and request validation benchmark.
+
+Starts --runs fresh interpreters that each import the app, build it with
+create_app() and answer one request through the test client, and reports the
+import-to-first-response time. Then times loading a typical payload through
+each validation schema, both with a new schema instance per call (as the
+routes used to do) and with the shared instances the routes use now.
+
+    cd backend
+    python benchmarks/startup_bench.py --runs 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+COLD_START = r'''
+import time
+began = time.perf_counter()
+from app import create_app
+app = create_app()
+assert app.test_client().get('/').status_code == 200
+print((time.perf_counter() - began) * 1000)
+'''
+
+PAYLOADS = {
+    'TaskSchema': {'title': 'Write the report', 'description': 'Quarterly numbers', 'priority': 'high',
+                   'status': 'pending', 'due_date': '2030-01-01T10:00:00'},
+    'TaskUpdateSchema': {'status': 'completed'},
+    'RegisterSchema': {'username': 'bench_user', 'email': 'bench@example.com', 'password': 'Benchmark1',
+                       'first_name': 'Bench', 'last_name': 'User'},
+    'LoginSchema': {'email': 'bench@example.com', 'password': 'Benchmark1'},
+}
+
+
+def cold_start(runs, database_path):
+    env = dict(os.environ, DATABASE_PATH=database_path,
+               JWT_SECRET=os.environ.get('JWT_SECRET') or 'benchmark-secret-key-with-enough-bytes')
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', COLD_START], cwd=SRC, env=env,
+                                capture_output=True, text=True, check=True)
+        timings.append(float(result.stdout))
+    return {'median_ms': round(statistics.median(timings), 1), 'min_ms': round(min(timings), 1)}
+
+
+def validation(number):
+    sys.path.insert(0, SRC)
+    from routes import auth, tasks
+    shared = {
+        'TaskSchema': tasks.task_schema,
+        'TaskUpdateSchema': tasks.task_update_schema,
+        'RegisterSchema': auth.register_schema,
+        'LoginSchema': auth.login_schema,
+    }
+    report = {}
+    for name, schema in shared.items():
+        payload = PAYLOADS[name]
+        new_each_time = min(timeit.repeat(lambda: type(schema)().load(payload), number=number, repeat=5))
+        reused = min(timeit.repeat(lambda: schema.load(payload), number=number, repeat=5))
+        report[name] = {
+            'new_instance_us': round(new_each_time / number * 1e6, 1),
+            'shared_instance_us': round(reused / number * 1e6, 1),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=15, help='fresh interpreters to start')
+    parser.add_argument('--number', type=int, default=20000, help='loads per validation timing')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, 'bench.db')
+        os.environ['DATABASE_PATH'] = database_path
+        report = {
+            'coldStart': cold_start(args.runs, database_path),
+            'validation': validation(args.number),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""composite indexes for the per-user task access paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+# IF NOT EXISTS keeps this safe on databases where db.create_all() already
+# created the indexes declared on the Task model
+INDEXES = {
+    'ix_tasks_user_created': ('user_id', 'created_at', 'id'),
+    'ix_tasks_user_status_created': ('user_id', 'status', 'created_at', 'id'),
+    'ix_tasks_user_priority_created': ('user_id', 'priority', 'created_at', 'id'),
+}
+
+
+def upgrade():
+    for name, columns in INDEXES.items():
+        op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON tasks ({", ".join(columns)})')
+    op.execute('ANALYZE tasks')
+
+
+def downgrade():
+    for name in INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
@@ -0,0 +1,64 @@
+"""FTS5 search index over task titles and descriptions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy.exc import OperationalError
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+# The FTS5 index over task titles and descriptions and the triggers keeping
+# it in sync, as of this revision
+CREATE_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.rowid, new.title, coalesce(new.description, '')); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "DELETE FROM tasks_fts WHERE rowid = old.rowid; END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "UPDATE tasks_fts SET title = new.title, description = coalesce(new.description, '') "
+    "WHERE rowid = old.rowid; END",
+)
+
+DROP_STATEMENTS = (
+    'DROP TRIGGER IF EXISTS tasks_fts_au',
+    'DROP TRIGGER IF EXISTS tasks_fts_ad',
+    'DROP TRIGGER IF EXISTS tasks_fts_ai',
+    'DROP TABLE IF EXISTS tasks_fts',
+)
+
+
+def upgrade():
+    connection = op.get_bind()
+
+    # Databases made by create_all() may already have the index; build it afresh
+    for statement in DROP_STATEMENTS:
+        op.execute(statement)
+
+    # SQLite builds without FTS5 keep using LIKE matching for search
+    try:
+        with connection.begin_nested():
+            for statement in CREATE_STATEMENTS:
+                op.execute(statement)
+    except OperationalError:
+        return
+    op.execute(
+        "INSERT INTO tasks_fts(rowid, title, description) "
+        "SELECT rowid, title, coalesce(description, '') FROM tasks"
+    )
+
+
+def downgrade():
+    for statement in DROP_STATEMENTS:
+        op.execute(statement)
@@ -0,0 +1,63 @@
+"""per-user task_stats counters
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by db.create_all() already have the table, possibly
+    # without rows for tasks written before it was added
+    connection = op.get_bind()
+    if 'task_stats' not in sa.inspect(connection).get_table_names():
+        op.create_table('task_stats',
+            sa.Column('user_id', sa.String(length=36), nullable=False),
+            sa.Column('pending', sa.Integer(), nullable=False),
+            sa.Column('in_progress', sa.Integer(), nullable=False),
+            sa.Column('completed', sa.Integer(), nullable=False),
+            sa.Column('low', sa.Integer(), nullable=False),
+            sa.Column('medium', sa.Integer(), nullable=False),
+            sa.Column('high', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+
+    # Such a table also has the version column from 0005; move it on so no
+    # ETag issued before the recount still matches
+    columns = {column['name'] for column in sa.inspect(connection).get_columns('task_stats')}
+    if 'version' in columns:
+        bump, version_column, version_value = ', version = version + 1', ', version', ', 1'
+    else:
+        bump = version_column = version_value = ''
+
+    # Count the tasks that already exist, replacing any counts kept so far
+    op.execute(
+        "UPDATE task_stats SET pending = 0, in_progress = 0, completed = 0, low = 0, medium = 0, high = 0"
+        + bump
+    )
+    op.execute(f"""
+        INSERT INTO task_stats (user_id, pending, in_progress, completed, low, medium, high{version_column})
+        SELECT user_id,
+               SUM(status = 'pending'), SUM(status = 'in-progress'), SUM(status = 'completed'),
+               SUM(priority = 'low'), SUM(priority = 'medium'), SUM(priority = 'high'){version_value}
+        FROM tasks
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            pending = excluded.pending, in_progress = excluded.in_progress, completed = excluded.completed,
+            low = excluded.low, medium = excluded.medium, high = excluded.high
+    """)
+
+
+def downgrade():
+    op.drop_table('task_stats')
@@ -0,0 +1,30 @@
+"""per-user task version for ETags
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables made by db.create_all() already have the column
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('task_stats')}
+    if 'version' in columns:
+        return
+    with op.batch_alter_table('task_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('task_stats', schema=None) as batch_op:
+        batch_op.drop_column('version')
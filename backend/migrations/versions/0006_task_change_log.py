@@ -0,0 +1,92 @@
+"""task change log and tombstones for delta sync
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+# Triggers as first shipped; 0007 replaces them
+CREATE_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS task_changes_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT OR REPLACE INTO task_changes(task_id, user_id, deleted, changed_at) "
+    "VALUES (new.id, new.user_id, 0, datetime('now')); END",
+    "CREATE TRIGGER IF NOT EXISTS task_changes_au AFTER UPDATE ON tasks BEGIN "
+    "INSERT OR REPLACE INTO task_changes(task_id, user_id, deleted, changed_at) "
+    "VALUES (new.id, new.user_id, 0, datetime('now')); END",
+    "CREATE TRIGGER IF NOT EXISTS task_changes_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT OR REPLACE INTO task_changes(task_id, user_id, deleted, changed_at) "
+    "VALUES (old.id, old.user_id, 1, datetime('now')); END",
+)
+
+
+def upgrade():
+    # Databases created by db.create_all() already have the tables, with the
+    # triggers, but tasks written before they were added aren't in the log
+    connection = op.get_bind()
+    existing = sa.inspect(connection).get_table_names()
+
+    if 'task_changes' not in existing:
+        op.create_table('task_changes',
+            sa.Column('seq', sa.Integer(), nullable=False),
+            sa.Column('task_id', sa.String(length=36), nullable=False),
+            sa.Column('user_id', sa.String(length=36), nullable=False),
+            sa.Column('deleted', sa.Boolean(), nullable=False),
+            sa.Column('changed_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('seq'),
+            sa.UniqueConstraint('task_id'),
+            sqlite_autoincrement=True
+        )
+        op.create_index('ix_task_changes_user_seq', 'task_changes', ['user_id', 'seq'], unique=False)
+    if 'task_change_horizons' not in existing:
+        op.create_table('task_change_horizons',
+            sa.Column('user_id', sa.String(length=36), nullable=False),
+            sa.Column('seq', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+
+    # Such a log also has the action column from 0007, without its default;
+    # fill it in as 0007 does for the rows logged here
+    columns = {column['name'] for column in sa.inspect(connection).get_columns('task_changes')}
+    action_column, action_value = (', action', ", 'update'") if 'action' in columns else ('', '')
+
+    # Record every task the log is missing once
+    logged_up_to = connection.execute(sa.text('SELECT coalesce(max(seq), 0) FROM task_changes')).scalar()
+    op.execute(
+        f"INSERT INTO task_changes(task_id, user_id{action_column}, deleted, changed_at) "
+        f"SELECT id, user_id{action_value}, 0, datetime('now') FROM tasks "
+        "WHERE NOT EXISTS (SELECT 1 FROM task_changes WHERE task_changes.task_id = tasks.id) "
+        "ORDER BY created_at, id"
+    )
+
+    # A log that was missing tasks may have missed their deletes too, so
+    # those users' cursors handed out before now must start over
+    if 'task_changes' in existing:
+        op.execute(
+            "INSERT INTO task_change_horizons(user_id, seq) "
+            f"SELECT user_id, max(seq) FROM task_changes WHERE seq > {logged_up_to} GROUP BY user_id "
+            "ON CONFLICT (user_id) DO UPDATE SET seq = max(seq, excluded.seq)"
+        )
+
+    for statement in CREATE_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade():
+    for name in ('task_changes_ad', 'task_changes_au', 'task_changes_ai'):
+        op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.drop_table('task_change_horizons')
+    op.drop_index('ix_task_changes_user_seq', table_name='task_changes')
+    op.drop_table('task_changes')
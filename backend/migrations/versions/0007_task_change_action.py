@@ -0,0 +1,70 @@
+"""record whether each task change was a create, update or delete
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+# Triggers that also record the action; they replace the ones from 0006
+CREATE_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS task_changes_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT OR REPLACE INTO task_changes(task_id, user_id, action, deleted, changed_at) "
+    "VALUES (new.id, new.user_id, 'create', 0, datetime('now')); END",
+    "CREATE TRIGGER IF NOT EXISTS task_changes_au AFTER UPDATE ON tasks BEGIN "
+    "INSERT OR REPLACE INTO task_changes(task_id, user_id, action, deleted, changed_at) "
+    "VALUES (new.id, new.user_id, 'update', 0, datetime('now')); END",
+    "CREATE TRIGGER IF NOT EXISTS task_changes_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT OR REPLACE INTO task_changes(task_id, user_id, action, deleted, changed_at) "
+    "VALUES (old.id, old.user_id, 'delete', 1, datetime('now')); END",
+)
+
+DROP_TRIGGERS = (
+    'DROP TRIGGER IF EXISTS task_changes_ad',
+    'DROP TRIGGER IF EXISTS task_changes_au',
+    'DROP TRIGGER IF EXISTS task_changes_ai',
+)
+
+
+def upgrade():
+    # Tables made by db.create_all() already have the column
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('task_changes')}
+    if 'action' not in columns:
+        with op.batch_alter_table('task_changes', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('action', sa.String(length=10), nullable=False, server_default='update'))
+    op.execute("UPDATE task_changes SET action = 'delete' WHERE deleted = 1")
+
+    for statement in DROP_TRIGGERS + CREATE_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in DROP_TRIGGERS:
+        op.execute(statement)
+    with op.batch_alter_table('task_changes', schema=None) as batch_op:
+        batch_op.drop_column('action')
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS task_changes_ai AFTER INSERT ON tasks BEGIN "
+        "INSERT OR REPLACE INTO task_changes(task_id, user_id, deleted, changed_at) "
+        "VALUES (new.id, new.user_id, 0, datetime('now')); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS task_changes_au AFTER UPDATE ON tasks BEGIN "
+        "INSERT OR REPLACE INTO task_changes(task_id, user_id, deleted, changed_at) "
+        "VALUES (new.id, new.user_id, 0, datetime('now')); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS task_changes_ad AFTER DELETE ON tasks BEGIN "
+        "INSERT OR REPLACE INTO task_changes(task_id, user_id, deleted, changed_at) "
+        "VALUES (old.id, old.user_id, 1, datetime('now')); END"
+    )
@@ -0,0 +1,108 @@
+"""key storage set by KEY_STORAGE and converted with `flask convert-keys`
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+import uuid
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+# Every column holding a user or task id at this revision
+KEY_COLUMNS = (
+    ('users', 'id'),
+    ('tasks', 'id'),
+    ('tasks', 'user_id'),
+    ('task_stats', 'user_id'),
+    ('task_changes', 'task_id'),
+    ('task_changes', 'user_id'),
+    ('task_change_horizons', 'user_id'),
+)
+
+# The change log triggers from 0007, dropped while tasks.id is rewritten so
+# the conversion isn't logged as task changes
+CREATE_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS task_changes_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT OR REPLACE INTO task_changes(task_id, user_id, action, deleted, changed_at) "
+    "VALUES (new.id, new.user_id, 'create', 0, datetime('now')); END",
+    "CREATE TRIGGER IF NOT EXISTS task_changes_au AFTER UPDATE ON tasks BEGIN "
+    "INSERT OR REPLACE INTO task_changes(task_id, user_id, action, deleted, changed_at) "
+    "VALUES (new.id, new.user_id, 'update', 0, datetime('now')); END",
+    "CREATE TRIGGER IF NOT EXISTS task_changes_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT OR REPLACE INTO task_changes(task_id, user_id, action, deleted, changed_at) "
+    "VALUES (old.id, old.user_id, 'delete', 1, datetime('now')); END",
+)
+
+DROP_TRIGGERS = (
+    'DROP TRIGGER IF EXISTS task_changes_ad',
+    'DROP TRIGGER IF EXISTS task_changes_au',
+    'DROP TRIGGER IF EXISTS task_changes_ai',
+)
+
+
+# 16 raw bytes of a UUID string; anything else is kept as its UTF-8 bytes
+def key_to_blob(value):
+    if not isinstance(value, str):
+        return value
+    try:
+        return uuid.UUID(value).bytes
+    except ValueError:
+        return value.encode()
+
+
+# UUID string of 16 stored bytes
+def key_to_text(value):
+    if not isinstance(value, bytes):
+        return value
+    return str(uuid.UUID(bytes=value)) if len(value) == 16 else value.decode(errors='replace')
+
+
+# rewrite every id column to 'text' or 'blob' storage in place; rows already
+# stored that way are left alone
+def convert_keys(storage):
+    if storage not in ('text', 'blob'):
+        raise ValueError(f"Unknown key storage {storage!r}, expected 'text' or 'blob'")
+
+    connection = op.get_bind()
+    dbapi_connection = connection.connection.dbapi_connection
+    dbapi_connection.create_function('key_to_blob', 1, key_to_blob, deterministic=True)
+    dbapi_connection.create_function('key_to_text', 1, key_to_text, deterministic=True)
+    convert = 'key_to_blob' if storage == 'blob' else 'key_to_text'
+    source_type = 'text' if storage == 'blob' else 'blob'
+
+    for statement in DROP_TRIGGERS:
+        op.execute(statement)
+
+    # Parent and child keys change in the same transaction
+    op.execute('PRAGMA defer_foreign_keys = ON')
+    tables = set(inspect(connection).get_table_names())
+    for table, column in KEY_COLUMNS:
+        if table in tables:
+            op.execute(
+                f'UPDATE {table} SET {column} = {convert}({column}) '
+                f"WHERE typeof({column}) = '{source_type}'"
+            )
+
+    for statement in CREATE_TRIGGERS:
+        op.execute(statement)
+
+
+# The stored keys don't change: KEY_STORAGE is read by the app, and
+# `flask convert-keys` converts a database to it, so the result doesn't
+# depend on the environment the migration runs in
+def upgrade():
+    pass
+
+
+# Revisions before this one only read text keys
+def downgrade():
+    convert_keys('text')
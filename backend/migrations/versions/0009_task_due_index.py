@@ -0,0 +1,27 @@
+"""partial index for due-date views over open tasks
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_user_due_open ON tasks (user_id, due_date, id) "
+        "WHERE status != 'completed'"
+    )
+    op.execute('ANALYZE tasks')
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_tasks_user_due_open')
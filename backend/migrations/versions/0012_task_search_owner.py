@@ -0,0 +1,87 @@
+"""scope the FTS5 search index to each task's owner
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy.exc import OperationalError
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+# The owner's id as one token: the UUID's 32 hex digits for text and blob keys
+OWNER = (
+    "CASE WHEN typeof({0}) = 'blob' AND length({0}) = 16 THEN hex({0}) "
+    "ELSE replace(CAST({0} AS TEXT), '-', '') END"
+)
+
+# The index with an owner column, and the triggers keeping it in sync, as of
+# this revision
+CREATE_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, owner, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description, owner) "
+    f"VALUES (new.rowid, new.title, coalesce(new.description, ''), {OWNER.format('new.user_id')}); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "DELETE FROM tasks_fts WHERE rowid = old.rowid; END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description, user_id ON tasks BEGIN "
+    "UPDATE tasks_fts SET title = new.title, description = coalesce(new.description, ''), "
+    f"owner = {OWNER.format('new.user_id')} WHERE rowid = old.rowid; END",
+)
+
+# The index from 0003
+PREVIOUS_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.rowid, new.title, coalesce(new.description, '')); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "DELETE FROM tasks_fts WHERE rowid = old.rowid; END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "UPDATE tasks_fts SET title = new.title, description = coalesce(new.description, '') "
+    "WHERE rowid = old.rowid; END",
+)
+
+DROP_STATEMENTS = (
+    'DROP TRIGGER IF EXISTS tasks_fts_au',
+    'DROP TRIGGER IF EXISTS tasks_fts_ad',
+    'DROP TRIGGER IF EXISTS tasks_fts_ai',
+    'DROP TABLE IF EXISTS tasks_fts',
+)
+
+
+# drop the index and build it again from the tasks table with the given
+# statements; SQLite builds without FTS5 keep using LIKE matching
+def rebuild(create_statements, columns, values):
+    connection = op.get_bind()
+    for statement in DROP_STATEMENTS:
+        op.execute(statement)
+
+    try:
+        with connection.begin_nested():
+            for statement in create_statements:
+                op.execute(statement)
+    except OperationalError:
+        return
+    op.execute(f"INSERT INTO tasks_fts(rowid, {columns}) SELECT rowid, {values} FROM tasks")
+
+
+def upgrade():
+    rebuild(
+        CREATE_STATEMENTS,
+        'title, description, owner',
+        f"title, coalesce(description, ''), {OWNER.format('user_id')}"
+    )
+
+
+def downgrade():
+    rebuild(PREVIOUS_STATEMENTS, 'title, description', "title, coalesce(description, '')")
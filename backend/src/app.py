@@ -1,70 +1,160 @@
 from flask import Flask, jsonify
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from flask_migrate import Migrate
 from dotenv import load_dotenv
+import click
 import os
 from database import db
 from config import Config
+from services.sqlite_profile import apply_sqlite_profile
+from services.json_provider import init_json_provider
+from services.request_metrics import init_request_metrics
+from services.key_storage import check_key_storage
+from services.compression import init_compression
+from services.sharding import create_shard_tables, shard_binds
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Flask app
-app = Flask(__name__)
-
-# Configuration
-app.config.from_object(Config)
-
-# SQLite database configuration
-database_path = os.getenv('DATABASE_PATH', 'task_management.db')
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Initialize extensions
-db.init_app(app)
-jwt = JWTManager(app)
-cors = CORS(app)
-migrate = Migrate(app, db)
-
 # Import models
 from models.user import User
 from models.task import Task
+from models.task_stats import TaskStats
+from models.task_change import TaskChange
+from models.task_change_horizon import TaskChangeHorizon
+from models.revoked_token import RevokedToken
+from models.task_completion_rollup import TaskCompletionRollup
+
+# Keep derived task data in sync with task writes
+import services.task_stats
+import services.task_changes
+import services.task_analytics
+
+from services.profile_cache import init_profile_cache
+from services.group_commit import init_group_commit
+from services.token_revocation import init_token_revocation
 
 # Import routes
 from routes.auth import auth_bp
 from routes.tasks import tasks_bp
+from routes.task_transfer import transfer_bp
+from routes.task_sync import sync_bp
+from routes.task_events import events_bp
 
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
-
-# Test route
-@app.route('/')
-def home():
-    return jsonify({'message': 'Task Management API is running!'})
-
-# Error handlers
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({'success': False, 'message': 'Resource not found'}), 404
+MIGRATIONS_DIRECTORY = os.path.join(os.path.dirname(__file__), '..', 'migrations')
 
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({'success': False, 'message': 'Internal server error'}), 500
+# Flask-Migrate imports alembic, which costs more at startup than the rest of
+# the app; only the `flask` CLI (`flask db ...`, `flask upgrade-shards`) needs it
+def init_migrate(app):
+    from flask_migrate import Migrate
+    Migrate(app, db, directory=MIGRATIONS_DIRECTORY, render_as_batch=True)
 
-# JWT error handlers
-@jwt.expired_token_loader
-def expired_token_callback(jwt_header, jwt_payload):
-    return jsonify({'success': False, 'message': 'Token has expired'}), 401
+# build the application. Migrate is set up when running under the `flask`
+# CLI unless `migrate` says otherwise; tables are created only when
+# `create_tables` (default: the CREATE_TABLES setting) asks for it.
+def create_app(config_object=Config, migrate=None, create_tables=None):
+    app = Flask(__name__)
+    
+    # Configuration
+    app.config.from_object(config_object)
+    
+    # SQLite database configuration
+    database_path = os.getenv('DATABASE_PATH', 'task_management.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    
+    # One engine per task shard when SHARD_COUNT is set
+    app.config['SQLALCHEMY_BINDS'] = shard_binds(app)
+    
+    # Initialize extensions
+    init_json_provider(app)
+    jwt = JWTManager(app)
+    db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_profile(engine, app.config)
+        init_request_metrics(app, db.engines.values())
+        check_key_storage(app, db.engine)
+    # Registered after the metrics hooks so their timings include compression
+    init_compression(app)
+    CORS(app)
+    if migrate is None:
+        migrate = click.get_current_context(silent=True) is not None
+    if migrate:
+        init_migrate(app)
+    
+    # Check tokens against the revoked_tokens list kept in memory
+    init_token_revocation(app, jwt)
+    
+    # Cache serialized user profiles, invalidated when a user row changes
+    init_profile_cache(app)
+    
+    # Coalesce concurrent task writes into shared transactions when GROUP_COMMIT is on
+    init_group_commit(app)
+    
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
+    app.register_blueprint(transfer_bp, url_prefix='/api/tasks')
+    app.register_blueprint(sync_bp, url_prefix='/api/tasks')
+    app.register_blueprint(events_bp, url_prefix='/api/tasks')
+    
+    # Register CLI commands
+    from commands import register_commands
+    register_commands(app)
+    
+    register_handlers(app, jwt)
+    
+    if create_tables is None:
+        create_tables = app.config['CREATE_TABLES']
+    if create_tables:
+        with app.app_context():
+            db.create_all()
+            create_shard_tables()
+    
+    return app
 
-@jwt.invalid_token_loader
-def invalid_token_callback(error):
-    return jsonify({'success': False, 'message': 'Invalid token'}), 401
+# register the test route and the JSON error handlers
+def register_handlers(app, jwt):
+    # Test route
+    @app.route('/')
+    def home():
+        return jsonify({'message': 'Task Management API is running!'})
+    
+    # Error handlers
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({'success': False, 'message': 'Resource not found'}), 404
+    
+    @app.errorhandler(500)
+    def internal_error(error):
+        return jsonify({'success': False, 'message': 'Internal server error'}), 500
+    
+    # JWT error handlers
+    @jwt.expired_token_loader
+    def expired_token_callback(jwt_header, jwt_payload):
+        return jsonify({'success': False, 'message': 'Token has expired'}), 401
+    
+    @jwt.invalid_token_loader
+    def invalid_token_callback(error):
+        return jsonify({'success': False, 'message': 'Invalid token'}), 401
+    
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({'success': False, 'message': 'Token has been revoked'}), 401
+    
+    @jwt.unauthorized_loader
+    def missing_token_callback(error):
+        return jsonify({'success': False, 'message': 'No token provided, authorization denied'}), 401
 
-@jwt.unauthorized_loader
-def missing_token_callback(error):
-    return jsonify({'success': False, 'message': 'No token provided, authorization denied'}), 401
+# `app:app` (gunicorn, `flask --app app`) is built on first access, so
+# importing this module for create_app() doesn't build an app as well
+def __getattr__(name):
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 if __name__ == '__main__':
     # Create database directory if it doesn't exist
@@ -73,6 +163,6 @@ if __name__ == '__main__':
         db_dir = os.path.dirname(database_path)
         os.makedirs(db_dir, exist_ok=True)
     
-    with app.app_context():
-        db.create_all()
-    app.run(host='0.0.0.0', port=int(os.getenv('PORT', 5000)), debug=True) 
+    # The development server creates missing tables on boot
+    app = create_app(create_tables=True)
+    app.run(host='0.0.0.0', port=int(os.getenv('PORT', 5000)), debug=True)
@@ -0,0 +1,28 @@
+"""ASGI entry point: uvicorn asgi:app
+
+Serves the auth routes, the task reads and writes and the task event stream
+from async handlers over aiosqlite, and every other route through the
+regular Flask app.
+"""
+from app import create_app
+from database import db
+from routes.async_auth import async_auth_handlers
+from routes.async_task_events import async_event_handlers
+from routes.async_tasks import async_task_handlers
+from services.asgi_dispatch import AsgiDispatcher
+from services.async_db import init_async_db
+from services.task_events import init_task_events
+
+flask_app = create_app()
+
+with flask_app.app_context():
+    async_db = init_async_db(flask_app, db.engines)
+    init_task_events(flask_app, async_db)
+
+app = AsgiDispatcher(
+    flask_app,
+    {**async_auth_handlers, **async_task_handlers, **async_event_handlers},
+    flask_app.config['ASGI_WSGI_THREADS'],
+    flask_app.config['ASGI_HOOK_THREADS'],
+    on_shutdown=async_db.dispose
+)
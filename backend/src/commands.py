@@ -0,0 +1,295 @@
+import os
+import re
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import create_engine, func, select, text, tuple_
+from sqlalchemy.pool import NullPool
+from models.task import Task
+from models.task_stats import TaskStats
+from models.task_change import TaskChange
+from models.user import User
+from routes.tasks import build_task_query, open_task_filter
+from services import key_storage, resharding, task_analytics, task_changes, task_search, task_stats, token_revocation
+from services.sharding import shard_path, task_engines, use_shard
+from database import db
+
+# A plan row like "SCAN tasks" means SQLite walks the whole table. The FTS
+# index always shows up as SCAN; without an M (MATCH) in its index string
+# the whole index is read.
+TABLE_SCAN = re.compile(
+    r'^SCAN (tasks|task_stats|task_changes|task_completion_rollups)\b'
+    rf'|^SCAN {task_search.FTS_TABLE} VIRTUAL TABLE INDEX \d+:(?!\S*M)'
+)
+
+# sample the queries issued by get_tasks, get_task_stats and get_task_analytics
+def task_access_queries(user_id='00000000-0000-0000-0000-000000000000'):
+    order = (Task.created_at.desc(), Task.id.desc())
+    filters = {
+        'list': {},
+        'list by status': {'status': 'pending'},
+        'list by priority': {'priority': 'high'},
+        'list by status and priority': {'status': 'pending', 'priority': 'high'},
+        'list by search': {'search': 'report'},
+    }
+    
+    queries = {}
+    for name, kwargs in filters.items():
+        query = build_task_query(user_id, **kwargs)
+        queries[name] = query.order_by(*order).offset(20).limit(11)
+        queries[f'{name} (count)'] = select(func.count()).select_from(query.order_by(None).subquery())
+    
+    queries['list by ranked search'] = build_task_query(user_id, search='report', ranked=True).order_by(*order).limit(11)
+    queries['list after cursor'] = build_task_query(user_id).filter(
+        tuple_(Task.created_at, Task.id) < (datetime(2024, 1, 1), user_id)
+    ).order_by(*order).limit(11)
+    queries['list overdue'] = build_task_query(user_id, overdue=True).order_by(*order).limit(11)
+    queries['due soon'] = build_task_query(user_id).filter(
+        open_task_filter(), Task.due_date >= datetime(2024, 1, 1), Task.due_date < datetime(2024, 1, 8)
+    ).order_by(Task.due_date, Task.id).limit(21)
+    queries['stats'] = select(TaskStats).where(TaskStats.user_id == user_id)
+    queries['analytics by week'] = task_analytics.completion_query(
+        user_id, date(2024, 1, 1), date(2024, 12, 31), 'week'
+    )
+    queries['changes since'] = select(TaskChange).where(
+        TaskChange.user_id == user_id, TaskChange.seq > 100
+    ).order_by(TaskChange.seq).limit(101)
+    return queries
+
+# the SQL of a query with its parameters inlined
+def compile_query(query):
+    statement = getattr(query, 'statement', query)
+    return str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+
+# run EXPLAIN QUERY PLAN for a query and return the plan details
+def explain_query_plan(query):
+    rows = db.session.execute(
+        text(f'EXPLAIN QUERY PLAN {compile_query(query)}'), bind_arguments={'mapper': Task.__mapper__}
+    ).all()
+    return [row[-1] for row in rows]
+
+# The FTS index holds every user's tasks, and the plan can't show what a
+# MATCH searches for: a search must also match on the user as owner, or it
+# walks every user's matches
+def unscoped_search(query, user_id):
+    sql = compile_query(query)
+    return task_search.FTS_TABLE in sql and task_search.owner_filter(user_id) not in sql
+
+@click.command('check-query-plans')
+@with_appcontext
+def check_query_plans_command():
+    """Fail if any task list or stats query falls back to a table scan."""
+    user_id = '00000000-0000-0000-0000-000000000000'
+    failures = 0
+    # Every shard has the same schema, so the first one stands for all
+    shard, _ = task_engines()[0]
+    with use_shard(shard):
+        for name, query in task_access_queries(user_id).items():
+            details = explain_query_plan(query)
+            scans = [detail for detail in details if TABLE_SCAN.match(detail)]
+            unscoped = unscoped_search(query, user_id)
+            click.echo(f"{'FAIL' if scans or unscoped else 'ok'}: {name}")
+            for detail in details:
+                click.echo(f'    {detail}')
+            if unscoped:
+                click.echo(f'    MATCH on {task_search.FTS_TABLE} is not limited to the user')
+            failures += bool(scans or unscoped)
+    
+    if failures:
+        raise click.ClickException(f'{failures} query plan(s) scan the tasks table or the whole search index')
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Recreate the FTS5 task search index from the tasks table."""
+    rebuilt = []
+    for shard, engine in task_engines():
+        with engine.begin() as connection:
+            rebuilt.append((shard, task_search.rebuild_search_index(connection)))
+    missing = [shard for shard, ok in rebuilt if not ok]
+    if missing:
+        raise click.ClickException(
+            f'SQLite was built without FTS5 for {len(missing)} of {len(rebuilt)} database(s); search uses LIKE matching'
+        )
+    click.echo(f'Search index rebuilt in {len(rebuilt)} database(s)')
+
+@click.command('rebuild-task-stats')
+@with_appcontext
+def rebuild_task_stats_command():
+    """Recompute the per-user task_stats counters from the tasks table."""
+    for _, engine in task_engines():
+        with engine.begin() as connection:
+            task_stats.rebuild_task_stats(connection)
+    click.echo('Task stats rebuilt')
+
+@click.command('rebuild-task-analytics')
+@with_appcontext
+def rebuild_task_analytics_command():
+    """Recompute the task completion rollups from the tasks table."""
+    for _, engine in task_engines():
+        with engine.begin() as connection:
+            task_analytics.rebuild_task_analytics(connection)
+    click.echo('Task analytics rebuilt')
+
+@click.command('rebuild-change-log')
+@with_appcontext
+def rebuild_change_log_command():
+    """Recreate the task change triggers and re-record every task as changed."""
+    for _, engine in task_engines():
+        with engine.begin() as connection:
+            task_changes.rebuild_change_log(connection)
+    click.echo('Change log rebuilt')
+
+@click.command('prune-task-tombstones')
+@click.option('--days', default=30, show_default=True, help='Keep tombstones newer than this many days.')
+@with_appcontext
+def prune_task_tombstones_command(days):
+    """Delete old delete tombstones from the task change log."""
+    pruned = 0
+    for _, engine in task_engines():
+        with engine.begin() as connection:
+            pruned += task_changes.prune_tombstones(connection, datetime.utcnow() - timedelta(days=days))
+    click.echo(f'Pruned {pruned} tombstone(s)')
+
+@click.command('convert-keys')
+@click.argument('storage', type=click.Choice(key_storage.KEY_STORAGES))
+@with_appcontext
+def convert_keys_command(storage):
+    """Rewrite user and task ids as text UUIDs or 16-byte blobs, in place."""
+    # The main database holds users; shards hold tasks
+    engines = [db.engine] + [engine for shard, engine in task_engines() if shard is not None]
+    converted = 0
+    for engine in engines:
+        with engine.begin() as connection:
+            converted += key_storage.convert_key_storage(connection, storage)
+    click.echo(f'Converted {converted} key value(s) to {storage}; set KEY_STORAGE={storage}')
+
+# run an alembic command on one shard's connection
+def migrate_shard(connection, name, revision):
+    # Imported here so the app can start without loading alembic
+    from alembic import command as alembic_command
+    config = current_app.extensions['migrate'].migrate.get_config()
+    config.attributes['connection'] = connection
+    getattr(alembic_command, name)(config, revision)
+
+# migrate every shard; `flask db upgrade` still migrates the main database
+def migrate_shards(name, revision):
+    shards = [(shard, engine) for shard, engine in task_engines() if shard is not None]
+    if not shards:
+        raise click.ClickException('SHARD_COUNT is not set; use `flask db upgrade` for the single database')
+    for shard, engine in shards:
+        click.echo(f'Shard {shard}: {engine.url.database}')
+        with engine.begin() as connection:
+            migrate_shard(connection, name, revision)
+
+@click.command('upgrade-shards')
+@click.argument('revision', default='head')
+@with_appcontext
+def upgrade_shards_command(revision):
+    """Upgrade every task shard to a migration revision."""
+    migrate_shards('upgrade', revision)
+
+@click.command('downgrade-shards')
+@click.argument('revision')
+@with_appcontext
+def downgrade_shards_command(revision):
+    """Downgrade every task shard to a migration revision."""
+    migrate_shards('downgrade', revision)
+
+@click.command('reshard')
+@click.argument('count', type=click.IntRange(min=1))
+@with_appcontext
+def reshard_command(count):
+    """Copy all task data into COUNT new shard files."""
+    if count == current_app.config['SHARD_COUNT']:
+        raise click.ClickException(f'The tasks are already in {count} shard(s)')
+    paths = [shard_path(current_app, index, count) for index in range(count)]
+    existing = [path for path in paths if os.path.exists(path)]
+    if existing:
+        raise click.ClickException(f'{existing[0]} already exists; remove the old shard files first')
+    os.makedirs(os.path.dirname(paths[0]), exist_ok=True)
+    
+    # The new files get the full migrated schema, then the data; on any
+    # failure they are removed and the current layout is left as it was
+    engines = [create_engine(f'sqlite:///{path}', poolclass=NullPool) for path in paths]
+    try:
+        for engine in engines:
+            with engine.begin() as connection:
+                migrate_shard(connection, 'upgrade', 'head')
+        with ExitStack() as stack:
+            sources = [stack.enter_context(engine.begin()) for _, engine in task_engines()]
+            targets = [stack.enter_context(engine.begin()) for engine in engines]
+            copied = resharding.copy_to_shards(sources, targets)
+    except Exception:
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    
+    for index, tasks in enumerate(copied):
+        click.echo(f'Shard {index}: {tasks} task(s) -> {paths[index]}')
+    click.echo(f'Set SHARD_COUNT={count} and restart the app. The current task data was left '
+               'in place; remove it once the new layout is live.')
+
+@click.command('shard-status')
+@with_appcontext
+def shard_status_command():
+    """Show how many users and tasks each task database holds."""
+    for shard, engine in task_engines():
+        with engine.connect() as connection:
+            tasks, users = connection.exec_driver_sql(
+                'SELECT count(*), count(DISTINCT user_id) FROM tasks'
+            ).one()
+        name = 'main database' if shard is None else f'shard {shard}'
+        click.echo(f'{name}: {tasks} task(s) of {users} user(s) in {engine.url.database}')
+
+# set a user's is_active flag; deactivating also revokes their tokens
+def set_user_active(email, active):
+    user = User.query.filter_by(email=email).first()
+    if not user:
+        raise click.ClickException(f'No user with email {email}')
+    user.is_active = active
+    db.session.commit()
+
+@click.command('deactivate-user')
+@click.argument('email')
+@with_appcontext
+def deactivate_user_command(email):
+    """Deactivate a user and revoke every token issued to them."""
+    set_user_active(email, False)
+    click.echo(f'Deactivated {email}; their tokens are rejected within '
+               f"{current_app.config['TOKEN_REVOCATION_REFRESH_INTERVAL']:g} seconds")
+
+@click.command('activate-user')
+@click.argument('email')
+@with_appcontext
+def activate_user_command(email):
+    """Reactivate a user so they can log in again."""
+    set_user_active(email, True)
+    click.echo(f'Activated {email}')
+
+@click.command('prune-revoked-tokens')
+@with_appcontext
+def prune_revoked_tokens_command():
+    """Delete revocations whose tokens have expired anyway."""
+    with db.engine.begin() as connection:
+        pruned = token_revocation.prune_revoked_tokens(connection)
+    click.echo(f'Pruned {pruned} revoked token(s)')
+
+def register_commands(app):
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(rebuild_task_stats_command)
+    app.cli.add_command(rebuild_task_analytics_command)
+    app.cli.add_command(rebuild_change_log_command)
+    app.cli.add_command(prune_task_tombstones_command)
+    app.cli.add_command(convert_keys_command)
+    app.cli.add_command(upgrade_shards_command)
+    app.cli.add_command(downgrade_shards_command)
+    app.cli.add_command(reshard_command)
+    app.cli.add_command(shard_status_command)
+    app.cli.add_command(deactivate_user_command)
+    app.cli.add_command(activate_user_command)
+    app.cli.add_command(prune_revoked_tokens_command)
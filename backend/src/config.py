@@ -1,14 +1,132 @@
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# read an optional integer setting from the environment
+def optional_int(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
 class Config:
     # Example secret keys
     SECRET_KEY = os.getenv('SECRET_KEY', 'jalal')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET', 'jalal')
-    JWT_ACCESS_TOKEN_EXPIRES = False  # Tokens don't expire
-    SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.getenv('DATABASE_PATH', 'task_management.db')}'
+    
+    # Access tokens are short-lived; clients renew them at POST
+    # /api/auth/refresh with the refresh token issued at login
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv('JWT_REFRESH_TOKEN_DAYS', 30)))
+    
+    # Each worker checks tokens against an in-memory copy of revoked_tokens
+    # (logouts, deactivated users) and reads new rows from the database at
+    # most this often (seconds)
+    TOKEN_REVOCATION_REFRESH_INTERVAL = float(os.getenv('TOKEN_REVOCATION_REFRESH_INTERVAL', 5))
+    
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.getenv('DATABASE_PATH', 'task_management.db')}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-
+    
+    # Run db.create_all() (and create the shard schemas) when the app is
+    # built; migrations (`flask db upgrade`) are the usual way to set up the
+    # schema, and the development server (`python src/app.py`) always does it
+    CREATE_TABLES = os.getenv('CREATE_TABLES', 'false').lower() in ('1', 'true', 'yes')
+    
+    # SQLite engine profile: 'default' keeps SQLite's defaults, 'production'
+    # enables WAL, synchronous=NORMAL, a busy timeout and a larger cache/mmap
+    SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'default')
+    
+    # Optional per-pragma overrides of the selected profile
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS')
+    SQLITE_BUSY_TIMEOUT_MS = optional_int('SQLITE_BUSY_TIMEOUT_MS')
+    SQLITE_CACHE_SIZE = optional_int('SQLITE_CACHE_SIZE')
+    SQLITE_MMAP_SIZE = optional_int('SQLITE_MMAP_SIZE')
+    
+    # Connection pool per worker process
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('SQLALCHEMY_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('SQLALCHEMY_POOL_TIMEOUT', 30)),
+    }
+    
+    # Password hashing: werkzeug method string (e.g. 'pbkdf2:sha256:600000'
+    # or 'scrypt:32768:8:1'), worker processes (0 hashes inline), how many
+    # hashes may be queued or running, and how long a request waits for a slot
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 16))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 2.0))
+    
+    # Per-worker LRU cache of serialized user profiles: entry count and TTL in seconds
+    PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', 10000))
+    PROFILE_CACHE_TTL = float(os.getenv('PROFILE_CACHE_TTL', 60))
+    
+    # Rows fetched from the database per batch when streaming an export
+    TASK_EXPORT_CHUNK_SIZE = int(os.getenv('TASK_EXPORT_CHUNK_SIZE', 500))
+    
+    # Imports insert and commit this many rows at a time, and report at most
+    # this many rejected rows in detail
+    TASK_IMPORT_BATCH_SIZE = int(os.getenv('TASK_IMPORT_BATCH_SIZE', 1000))
+    TASK_IMPORT_MAX_ERRORS = int(os.getenv('TASK_IMPORT_MAX_ERRORS', 100))
+    
+    # JSON encoder for responses: 'auto' uses orjson when it is installed,
+    # 'orjson' requires it, 'default' keeps Flask's stdlib encoder
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+    
+    # Maximum number of operations accepted by POST /api/tasks/batch
+    TASK_BATCH_MAX_SIZE = int(os.getenv('TASK_BATCH_MAX_SIZE', 500))
+    
+    # Per-user task shards: with SHARD_COUNT set, each user's tasks (and their
+    # stats and change log) live in one of that many SQLite files in
+    # SHARD_DIR (relative to the database's folder), chosen by a hash of the
+    # user id, and DATABASE_PATH only holds users. 0 keeps everything in one
+    # database. Change it with `flask reshard`.
+    SHARD_COUNT = int(os.getenv('SHARD_COUNT', 0))
+    SHARD_DIR = os.getenv('SHARD_DIR', 'shards')
+    
+    # Primary key storage: 'text' (36-character UUID strings) or 'blob'
+    # (16 raw bytes); run `flask convert-keys` when changing it
+    KEY_STORAGE = os.getenv('KEY_STORAGE', 'text')
+    
+    # Group commit: task creates, updates and deletes from concurrent requests
+    # in one worker are applied in a shared transaction, gathered for up to
+    # GROUP_COMMIT_WINDOW_MS or GROUP_COMMIT_MAX_BATCH writes. A write the
+    # writer hasn't started within GROUP_COMMIT_TIMEOUT seconds is dropped
+    # and answered with a 503. Off by default.
+    GROUP_COMMIT = os.getenv('GROUP_COMMIT', 'false').lower() in ('1', 'true', 'yes')
+    GROUP_COMMIT_WINDOW_MS = float(os.getenv('GROUP_COMMIT_WINDOW_MS', 2))
+    GROUP_COMMIT_MAX_BATCH = int(os.getenv('GROUP_COMMIT_MAX_BATCH', 64))
+    GROUP_COMMIT_TIMEOUT = float(os.getenv('GROUP_COMMIT_TIMEOUT', 10))
+    
+    # ASGI entry point (src/asgi.py): threads per process running the routes
+    # that have no async handler through the regular Flask app
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 10))
+    # and threads running the request hooks (compression, metrics) of the
+    # async handlers off the event loop
+    ASGI_HOOK_THREADS = int(os.getenv('ASGI_HOOK_THREADS', 4))
+    
+    # Server-sent task events (ASGI entry point): how often each worker polls
+    # the change log (seconds), changes buffered per connection before it
+    # must resync, open streams per worker, keep-alive interval and how long
+    # one stream lasts before the client reconnects
+    EVENTS_POLL_INTERVAL = float(os.getenv('EVENTS_POLL_INTERVAL', 0.5))
+    EVENTS_BUFFER_SIZE = int(os.getenv('EVENTS_BUFFER_SIZE', 100))
+    EVENTS_MAX_CONNECTIONS = int(os.getenv('EVENTS_MAX_CONNECTIONS', 1000))
+    EVENTS_HEARTBEAT = float(os.getenv('EVENTS_HEARTBEAT', 15))
+    EVENTS_MAX_DURATION = float(os.getenv('EVENTS_MAX_DURATION', 300))
+    
+    # Per-request SQL/timing instrumentation: Server-Timing headers, a
+    # Prometheus /metrics endpoint and a warning log for requests slower than
+    # SLOW_REQUEST_MS (with their SQL). Off by default.
+    REQUEST_METRICS = os.getenv('REQUEST_METRICS', 'false').lower() in ('1', 'true', 'yes')
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 500))
+    
+    # Compress JSON/CSV responses of at least COMPRESSION_MIN_SIZE bytes with
+    # brotli (if the brotli package is installed) or gzip, as the client
+    # accepts; turn off when a reverse proxy already compresses
+    RESPONSE_COMPRESSION = os.getenv('RESPONSE_COMPRESSION', 'true').lower() in ('1', 'true', 'yes')
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
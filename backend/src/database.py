@@ -1,3 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from services.sharding import ShardedSession
 
-db = SQLAlchemy() 
\ No newline at end of file
+# The session routes per-user task tables to their shard when SHARD_COUNT is set
+db = SQLAlchemy(session_options={'class_': ShardedSession})
\ No newline at end of file
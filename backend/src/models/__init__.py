@@ -1,4 +1,9 @@
 from .user import User
 from .task import Task
+from .task_stats import TaskStats
+from .task_change import TaskChange
+from .task_change_horizon import TaskChangeHorizon
+from .revoked_token import RevokedToken
+from .task_completion_rollup import TaskCompletionRollup
 
-__all__ = ['User', 'Task'] 
\ No newline at end of file
+__all__ = ['User', 'Task', 'TaskStats', 'TaskChange', 'TaskChangeHorizon', 'RevokedToken', 'TaskCompletionRollup'] 
\ No newline at end of file
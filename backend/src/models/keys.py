@@ -0,0 +1,69 @@
+import os
+import time
+import uuid
+from sqlalchemy.types import TypeDecorator
+from config import Config
+from database import db
+
+# How user and task ids are stored: 'text' keeps the 36-character UUID
+# string, 'blob' stores the 16 raw bytes. The API, JWT identity and Python
+# code always see the string form. Changing this for an existing database
+# needs `flask convert-keys`.
+KEY_STORAGE = Config.KEY_STORAGE
+
+# time-ordered UUID (RFC 9562 version 7): 48-bit Unix milliseconds followed
+# by random bits, so new rows land at the right-hand edge of the B-tree
+def uuid7():
+    millis = time.time_ns() // 1_000_000
+    random_bits = int.from_bytes(os.urandom(10), 'big')
+    value = (millis & (1 << 48) - 1) << 80
+    value |= 0x7 << 76
+    value |= (random_bits >> 62 & 0xfff) << 64
+    value |= 0b10 << 62
+    value |= random_bits & (1 << 62) - 1
+    return uuid.UUID(int=value)
+
+# default for new primary keys
+def new_key():
+    return str(uuid7())
+
+# 16-byte form of a key; anything that is not a UUID becomes bytes that
+# match no row, so lookups by a malformed id find nothing instead of failing
+def key_to_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    try:
+        return uuid.UUID(value).bytes
+    except (TypeError, ValueError, AttributeError):
+        return str(value).encode()
+
+# string form of a stored key; rows not yet converted may still hold text
+def bytes_to_key(value):
+    if isinstance(value, str):
+        return value
+    return str(uuid.UUID(bytes=value)) if len(value) == 16 else value.decode(errors='replace')
+
+class BinaryUUID(TypeDecorator):
+    """UUID string in Python, stored as a 16-byte BLOB.
+    
+    The declared column type stays VARCHAR(36), so databases converted in
+    place and newly created ones have the same schema; SQLite stores each
+    value by its own type, which is what determines row and index size.
+    """
+    
+    impl = db.String(36)
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        return None if value is None else key_to_bytes(value)
+    
+    def process_result_value(self, value, dialect):
+        return None if value is None else bytes_to_key(value)
+    
+    # EXPLAIN and other literal-rendered statements need X'..' blob literals
+    def literal_processor(self, dialect):
+        return lambda value: f"X'{key_to_bytes(value).hex()}'"
+
+# column type for ids and references to them
+def key_type():
+    return BinaryUUID() if KEY_STORAGE == 'blob' else db.String(36)
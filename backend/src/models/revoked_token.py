@@ -0,0 +1,21 @@
+from database import db
+from models.keys import key_type
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    # Append-only log of revocations; workers keep an in-memory copy and read
+    # rows with a higher id than the last one they saw. A row with a jti
+    # revokes that one token (logout); a row without one revokes every token
+    # of the user issued at or before revoked_at (deactivation).
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36))
+    user_id = db.Column(key_type(), db.ForeignKey('users.id'), nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False)
+    
+    # After this the revoked tokens have expired anyway and the row can go
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<RevokedToken {self.id} {self.jti or self.user_id}>'
@@ -1,11 +1,20 @@
 from datetime import datetime
-import uuid
 from database import db
+from models.keys import key_type, new_key
 
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Per-user access paths: list by recency, optionally filtered by status or priority
+        db.Index('ix_tasks_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_tasks_user_status_created', 'user_id', 'status', 'created_at', 'id'),
+        db.Index('ix_tasks_user_priority_created', 'user_id', 'priority', 'created_at', 'id'),
+        # Due-date views only look at tasks that are still open
+        db.Index('ix_tasks_user_due_open', 'user_id', 'due_date', 'id',
+                 sqlite_where=db.text("status != 'completed'")),
+    )
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(key_type(), primary_key=True, default=new_key)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=True)
     priority = db.Column(db.String(10), default='medium', nullable=False)
@@ -16,7 +25,7 @@ class Task(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign key
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(key_type(), db.ForeignKey('users.id'), nullable=False)
     
     def __init__(self, title, user_id, description=None, priority='medium', 
                  status='pending', due_date=None):
@@ -24,8 +33,9 @@ class Task(db.Model):
         self.user_id = user_id
         self.description = description
         self.priority = priority
-        self.status = status
         self.due_date = due_date
+        # Tasks created as completed get a completed_at, like later updates
+        self.update_status(status)
     
     # update task status
     def update_status(self, new_status):
@@ -0,0 +1,23 @@
+from database import db
+from models.keys import key_type
+
+class TaskChange(db.Model):
+    __tablename__ = 'task_changes'
+    __table_args__ = (
+        # Delta sync reads one user's changes in sequence order
+        db.Index('ix_task_changes_user_seq', 'user_id', 'seq'),
+        {'sqlite_autoincrement': True},
+    )
+    
+    # Latest change per task, written by triggers on the tasks table. Each
+    # write replaces the task's row with a new, higher sequence number, and
+    # deleted tasks stay behind as tombstones.
+    seq = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(key_type(), unique=True, nullable=False)
+    user_id = db.Column(key_type(), db.ForeignKey('users.id'), nullable=False)
+    action = db.Column(db.String(10), default='update', nullable=False)
+    deleted = db.Column(db.Boolean, default=False, nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<TaskChange {self.seq} {self.task_id}>'
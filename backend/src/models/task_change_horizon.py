@@ -0,0 +1,13 @@
+from database import db
+from models.keys import key_type
+
+class TaskChangeHorizon(db.Model):
+    __tablename__ = 'task_change_horizons'
+    
+    # Highest sequence number of a pruned tombstone per user; sync cursors
+    # older than this may have missed deletes and must start over
+    user_id = db.Column(key_type(), db.ForeignKey('users.id'), primary_key=True)
+    seq = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<TaskChangeHorizon {self.user_id} {self.seq}>'
@@ -0,0 +1,19 @@
+from database import db
+from models.keys import key_type
+
+class TaskCompletionRollup(db.Model):
+    __tablename__ = 'task_completion_rollups'
+    
+    # Completed tasks per user, UTC day of completed_at and priority, kept up
+    # to date in the same transaction as each task write. A task that is
+    # reopened or deleted is taken back out of its day.
+    user_id = db.Column(key_type(), db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    priority = db.Column(db.String(10), primary_key=True)
+    completed = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Sum of whole seconds from created_at to completed_at over those tasks
+    completion_seconds = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<TaskCompletionRollup {self.user_id} {self.day} {self.priority}>'
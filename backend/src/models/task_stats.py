@@ -0,0 +1,36 @@
+from database import db
+from models.keys import key_type
+
+class TaskStats(db.Model):
+    __tablename__ = 'task_stats'
+    
+    # One row per user, kept up to date in the same transaction as each task write
+    user_id = db.Column(key_type(), db.ForeignKey('users.id'), primary_key=True)
+    pending = db.Column(db.Integer, default=0, nullable=False)
+    in_progress = db.Column(db.Integer, default=0, nullable=False)
+    completed = db.Column(db.Integer, default=0, nullable=False)
+    low = db.Column(db.Integer, default=0, nullable=False)
+    medium = db.Column(db.Integer, default=0, nullable=False)
+    high = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Bumped on every write to the user's tasks; read endpoints derive ETags from it
+    version = db.Column(db.Integer, default=0, nullable=False)
+    
+    # task counts keyed by status
+    def status_counts(self):
+        return {
+            'pending': self.pending or 0,
+            'in-progress': self.in_progress or 0,
+            'completed': self.completed or 0
+        }
+    
+    # task counts keyed by priority
+    def priority_counts(self):
+        return {
+            'low': self.low or 0,
+            'medium': self.medium or 0,
+            'high': self.high or 0
+        }
+    
+    def __repr__(self):
+        return f'<TaskStats {self.user_id}>'
@@ -1,12 +1,12 @@
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
-import uuid
 from database import db
+from models.keys import key_type, new_key
+from services.passwords import hash_password, verify_password
 
 class User(db.Model):
     __tablename__ = 'users'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(key_type(), primary_key=True, default=new_key)
     username = db.Column(db.String(30), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
@@ -26,13 +26,13 @@ class User(db.Model):
         self.first_name = first_name
         self.last_name = last_name
     
-    # set password
+    # set password (hashed in the bounded password worker pool)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
-    # check password
+    # check password (verified in the bounded password worker pool)
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     # convert user to dictionary
     def to_dict(self):
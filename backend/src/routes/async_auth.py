@@ -0,0 +1,202 @@
+import asyncio
+from flask import request, jsonify
+from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt_identity
+from marshmallow import ValidationError
+from sqlalchemy import select
+from models.user import User
+from routes.auth import (login_schema, password_pool_busy_response, register_schema,
+                         validate_password_strength, validate_username_format)
+from services.asgi_dispatch import async_jwt_required
+from services.async_db import get_async_db
+from services.passwords import PasswordHashingBusy, needs_rehash
+from services.profile_cache import get_profile_cache
+
+# Async versions of the auth routes for the ASGI entry point. Validation and
+# responses are shared with routes/auth.py; password hashing runs off the
+# event loop.
+
+async def register():
+    try:
+        # Validate request data
+        data = register_schema.load(request.json)
+        
+        # Additional validations
+        is_valid_password, password_error = validate_password_strength(data['password'])
+        if not is_valid_password:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': [{'field': 'password', 'message': password_error}]
+            }), 400
+        
+        is_valid_username, username_error = validate_username_format(data['username'])
+        if not is_valid_username:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': [{'field': 'username', 'message': username_error}]
+            }), 400
+        
+        async with get_async_db().session() as session:
+            # Check if user already exists
+            existing_user = (await session.execute(select(User).where(
+                (User.email == data['email']) | (User.username == data['username'])
+            ).limit(1))).scalar()
+            
+            if existing_user:
+                return jsonify({
+                    'success': False,
+                    'message': 'User with this email or username already exists'
+                }), 400
+            
+            # Create new user; the constructor hashes the password
+            user = await asyncio.to_thread(
+                User,
+                username=data['username'],
+                email=data['email'],
+                password=data['password'],
+                first_name=data['first_name'],
+                last_name=data['last_name']
+            )
+            
+            session.add(user)
+            await session.commit()
+        
+        # Generate a short-lived access token and a refresh token to renew it
+        access_token = create_access_token(identity=user.id)
+        refresh_token = create_refresh_token(identity=user.id)
+        
+        return jsonify({
+            'success': True,
+            'message': 'User registered successfully',
+            'data': {
+                'token': access_token,
+                'refreshToken': refresh_token,
+                'user': user.to_dict()
+            }
+        }), 201
+    
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': 'Validation failed',
+            'errors': [{'field': field, 'message': errors} for field, errors in e.messages.items()]
+        }), 400
+    except PasswordHashingBusy:
+        return password_pool_busy_response()
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error during registration'
+        }), 500
+
+async def login():
+    try:
+        # Validate request data
+        data = login_schema.load(request.json)
+        
+        async with get_async_db().session() as session:
+            # Find user by email
+            user = (await session.execute(
+                select(User).filter_by(email=data['email']).limit(1)
+            )).scalar()
+            
+            if not user:
+                return jsonify({
+                    'success': False,
+                    'message': 'Invalid credentials'
+                }), 400
+            
+            # Check password
+            if not await asyncio.to_thread(user.check_password, data['password']):
+                return jsonify({
+                    'success': False,
+                    'message': 'Invalid credentials'
+                }), 400
+            
+            # Check if user is active
+            if not user.is_active:
+                return jsonify({
+                    'success': False,
+                    'message': 'Account is deactivated'
+                }), 400
+            
+            # Upgrade hashes made with an older method or cost while we know the password
+            if needs_rehash(user.password_hash):
+                try:
+                    await asyncio.to_thread(user.set_password, data['password'])
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+        
+        # Generate a short-lived access token and a refresh token to renew it
+        access_token = create_access_token(identity=user.id)
+        refresh_token = create_refresh_token(identity=user.id)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Login successful',
+            'data': {
+                'token': access_token,
+                'refreshToken': refresh_token,
+                'user': user.to_dict()
+            }
+        })
+    
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': 'Validation failed',
+            'errors': [{'field': field, 'message': errors} for field, errors in e.messages.items()]
+        }), 400
+    except PasswordHashingBusy:
+        return password_pool_busy_response()
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error during login'
+        }), 500
+
+@async_jwt_required()
+async def get_profile():
+    try:
+        current_user_id = get_jwt_identity()
+        
+        # Serve the already-serialized profile from the cache when we can
+        cache = get_profile_cache()
+        user_data = cache.get(current_user_id)
+        
+        if user_data is None:
+            # Don't cache what we read if the user changes meanwhile
+            generation = cache.generation(current_user_id)
+            async with get_async_db().session() as session:
+                user = await session.get(User, current_user_id)
+            
+            if not user:
+                return jsonify({
+                    'success': False,
+                    'message': 'User not found'
+                }), 404
+            
+            user_data = user.to_dict()
+            cache.set(current_user_id, user_data, generation)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'user': user_data
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error'
+        }), 500
+
+# Flask endpoint name -> async handler
+async_auth_handlers = {
+    'auth.register': register,
+    'auth.login': login,
+    'auth.get_profile': get_profile,
+}
@@ -0,0 +1,73 @@
+import time
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt_identity
+from routes.task_events import (event_stream_response, format_change, format_resync, format_start,
+                                last_event_id, stream_start, too_many_streams_response)
+from services.asgi_dispatch import async_jwt_required
+from services.async_db import get_async_db
+from services.task_events import get_task_events
+
+# Server-sent task events for the ASGI entry point. The stream is an async
+# generator waiting on the user's subscriber to the change log broker, so an
+# open connection costs a coroutine rather than a thread.
+
+# yield SSE messages until the stream's lifetime runs out or the client goes away
+async def follow_events(broker, subscriber, start_seq, backlog, heartbeat, max_duration):
+    try:
+        body, last_seq = format_start(start_seq, backlog)
+        yield body
+        
+        deadline = time.monotonic() + max_duration
+        while time.monotonic() < deadline:
+            changes = await subscriber.drain(min(heartbeat, max(deadline - time.monotonic(), 0)))
+            if subscriber.overflowed:
+                yield format_resync(last_seq)
+                return
+            
+            messages = []
+            for change in changes:
+                # Skip changes already sent from the backlog
+                if change.seq > last_seq:
+                    messages.append(format_change(change))
+                    last_seq = change.seq
+            yield ''.join(messages) if messages else ': keep-alive\n\n'
+    finally:
+        broker.unsubscribe(subscriber)
+
+# EventSource cannot send headers, so the token may also come as ?jwt=
+@async_jwt_required(locations=['headers', 'query_string'])
+async def stream_task_events():
+    try:
+        current_user_id = get_jwt_identity()
+        config = current_app.config
+        
+        broker = get_task_events()
+        subscriber = await broker.subscribe(current_user_id)
+        if subscriber is None:
+            return too_many_streams_response()
+        
+        try:
+            # Subscribe first so nothing committed from here on is missed
+            async with get_async_db().task_session(current_user_id) as session:
+                start_seq, backlog = await session.run_sync(
+                    stream_start, current_user_id, last_event_id(), config['EVENTS_BUFFER_SIZE'])
+        except BaseException:
+            broker.unsubscribe(subscriber)
+            raise
+        
+        response = event_stream_response(follow_events(
+            broker, subscriber, start_seq, backlog, config['EVENTS_HEARTBEAT'], config['EVENTS_MAX_DURATION']))
+        # Also release the slot if the stream is closed before it starts
+        response.call_on_close(lambda: broker.unsubscribe(subscriber))
+        return response
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error while opening the event stream'
+        }), 500
+
+# Flask endpoint name -> async handler
+async_event_handlers = {
+    'task_events.stream_task_events': stream_task_events,
+}
@@ -0,0 +1,64 @@
+from flask_jwt_extended import get_jwt_identity
+from routes import task_sync, tasks
+from services.asgi_dispatch import async_jwt_required
+from services.async_db import get_async_db
+
+# Async versions of the task routes for the ASGI entry point. Each runs the
+# handler of the matching route in routes/tasks.py on the user's aiosqlite
+# session: run_sync hands it a regular Session whose queries await the
+# database, so the event loop serves other requests in the meantime and the
+# responses are the ones the sync routes give.
+
+# run a task handler on the current user's aiosqlite session
+async def run_task_handler(handler, *args):
+    async with get_async_db().task_session(get_jwt_identity()) as session:
+        return await session.run_sync(handler, *args)
+
+@async_jwt_required()
+async def get_tasks():
+    return await run_task_handler(tasks.get_tasks_response)
+
+@async_jwt_required()
+async def get_due_tasks():
+    return await run_task_handler(tasks.get_due_tasks_response)
+
+@async_jwt_required()
+async def get_task(task_id):
+    return await run_task_handler(tasks.get_task_response, task_id)
+
+@async_jwt_required()
+async def create_task():
+    return await run_task_handler(tasks.create_task_response)
+
+@async_jwt_required()
+async def update_task(task_id):
+    return await run_task_handler(tasks.update_task_response, task_id)
+
+@async_jwt_required()
+async def delete_task(task_id):
+    return await run_task_handler(tasks.delete_task_response, task_id)
+
+@async_jwt_required()
+async def get_task_stats():
+    return await run_task_handler(tasks.get_task_stats_response)
+
+@async_jwt_required()
+async def get_task_analytics():
+    return await run_task_handler(tasks.get_task_analytics_response)
+
+@async_jwt_required()
+async def get_task_changes():
+    return await run_task_handler(task_sync.get_task_changes_response)
+
+# Flask endpoint name -> async handler
+async_task_handlers = {
+    'tasks.get_tasks': get_tasks,
+    'tasks.get_due_tasks': get_due_tasks,
+    'tasks.get_task': get_task,
+    'tasks.create_task': create_task,
+    'tasks.update_task': update_task,
+    'tasks.delete_task': delete_task,
+    'tasks.get_task_stats': get_task_stats,
+    'tasks.get_task_analytics': get_task_analytics,
+    'task_sync.get_task_changes': get_task_changes,
+}
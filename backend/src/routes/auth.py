@@ -1,9 +1,13 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token, jwt_required, get_jwt, get_jwt_identity
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
 from marshmallow import Schema, fields, ValidationError, validate
-from email_validator import validate_email, EmailNotValidError
 import re
 from models.user import User
+from services.passwords import PasswordHashingBusy, needs_rehash
+from services.profile_cache import get_profile_cache
+from services.token_revocation import revoke_token
 from database import db
 
 auth_bp = Blueprint('auth', __name__)
@@ -48,6 +52,19 @@ class LoginSchema(Schema):
     email = fields.Email(required=True)
     password = fields.Str(required=True)
 
+# Built once and reused by every request
+register_schema = RegisterSchema()
+login_schema = LoginSchema()
+
+# response for requests turned away because the password pool is saturated
+def password_pool_busy_response():
+    response = jsonify({
+        'success': False,
+        'message': 'Server is busy, please try again shortly'
+    })
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # validate password strength
 def validate_password_strength(password):
     if len(password) < 6:
@@ -70,8 +87,7 @@ def validate_username_format(username):
 def register():
     try:
         # Validate request data
-        schema = RegisterSchema()
-        data = schema.load(request.json)
+        data = register_schema.load(request.json)
         
         # Additional validations
         is_valid_password, password_error = validate_password_strength(data['password'])
@@ -113,24 +129,29 @@ def register():
         db.session.add(user)
         db.session.commit()
         
-        # Generate token
+        # Generate a short-lived access token and a refresh token to renew it
         access_token = create_access_token(identity=user.id)
+        refresh_token = create_refresh_token(identity=user.id)
         
         return jsonify({
             'success': True,
             'message': 'User registered successfully',
             'data': {
                 'token': access_token,
+                'refreshToken': refresh_token,
                 'user': user.to_dict()
             }
         }), 201
-        
+    
     except ValidationError as e:
         return jsonify({
             'success': False,
             'message': 'Validation failed',
             'errors': [{'field': field, 'message': errors} for field, errors in e.messages.items()]
         }), 400
+    except PasswordHashingBusy:
+        db.session.rollback()
+        return password_pool_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -142,8 +163,7 @@ def register():
 def login():
     try:
         # Validate request data
-        schema = LoginSchema()
-        data = schema.load(request.json)
+        data = login_schema.load(request.json)
         
         # Find user by email
         user = User.query.filter_by(email=data['email']).first()
@@ -168,50 +188,126 @@ def login():
                 'message': 'Account is deactivated'
             }), 400
         
-        # Generate token
+        # Upgrade hashes made with an older method or cost while we know the password
+        if needs_rehash(user.password_hash):
+            try:
+                user.set_password(data['password'])
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+        
+        # Generate a short-lived access token and a refresh token to renew it
         access_token = create_access_token(identity=user.id)
+        refresh_token = create_refresh_token(identity=user.id)
         
         return jsonify({
             'success': True,
             'message': 'Login successful',
             'data': {
                 'token': access_token,
+                'refreshToken': refresh_token,
                 'user': user.to_dict()
             }
         })
-        
+    
     except ValidationError as e:
         return jsonify({
             'success': False,
             'message': 'Validation failed',
             'errors': [{'field': field, 'message': errors} for field, errors in e.messages.items()]
         }), 400
+    except PasswordHashingBusy:
+        return password_pool_busy_response()
     except Exception as e:
         return jsonify({
             'success': False,
             'message': 'Server error during login'
         }), 500
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    try:
+        # Revoked refresh tokens, including those of deactivated users, were
+        # turned away by the revocation list before we got here
+        access_token = create_access_token(identity=get_jwt_identity())
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'token': access_token
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error while refreshing token'
+        }), 500
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    try:
+        # Revoke the token the request was made with
+        revoke_token(get_jwt())
+        
+        # and the refresh token, if the client sends it along
+        refresh_token = (request.get_json(silent=True) or {}).get('refreshToken')
+        if refresh_token:
+            try:
+                payload = decode_token(refresh_token)
+            except (PyJWTError, JWTExtendedException):
+                # Expired or invalid tokens can't be used anyway
+                payload = None
+            if payload and payload['jti'] != get_jwt()['jti'] and payload[current_app.config['JWT_IDENTITY_CLAIM']] == get_jwt_identity():
+                revoke_token(payload)
+        
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Logged out successfully'
+        })
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'Server error during logout'
+        }), 500
+
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
         
-        if not user:
-            return jsonify({
-                'success': False,
-                'message': 'User not found'
-            }), 404
+        # Serve the already-serialized profile from the cache when we can
+        cache = get_profile_cache()
+        user_data = cache.get(current_user_id)
+        
+        if user_data is None:
+            # Don't cache what we read if the user changes meanwhile
+            generation = cache.generation(current_user_id)
+            user = User.query.get(current_user_id)
+            
+            if not user:
+                return jsonify({
+                    'success': False,
+                    'message': 'User not found'
+                }), 404
+            
+            user_data = user.to_dict()
+            cache.set(current_user_id, user_data, generation)
         
         return jsonify({
             'success': True,
             'data': {
-                'user': user.to_dict()
+                'user': user_data
             }
         })
-        
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -0,0 +1,100 @@
+from flask import Blueprint, Response, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+import json
+from models.task_change_horizon import TaskChangeHorizon
+from services.task_changes import fetch_changes
+from services.task_events import latest_change_seq
+from database import db
+
+events_bp = Blueprint('task_events', __name__)
+
+# How long the browser waits before reconnecting, in milliseconds
+RECONNECT_DELAY_MS = 3000
+
+# SSE event name for each change log action
+EVENT_NAMES = {
+    'create': 'task.created',
+    'update': 'task.updated',
+    'delete': 'task.deleted'
+}
+
+# format one change as an SSE message whose id is its sequence number
+def format_change(change):
+    data = {'id': change.task_id}
+    if change.task is not None:
+        data['task'] = change.task
+    return f'id: {change.seq}\nevent: {EVENT_NAMES[change.action]}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+# the client missed too much; it should refetch through /api/tasks/changes
+def format_resync(seq):
+    return f'id: {seq}\nevent: resync\ndata: {{}}\n\n'
+
+# read the missed changes after a reconnect, or None if they can't all be replayed
+def replay_changes(session, user_id, since, limit):
+    horizon = session.get(TaskChangeHorizon, user_id)
+    if horizon and since < horizon.seq:
+        return None
+    changes = fetch_changes(session, since, limit + 1, user_id=user_id)
+    return changes if len(changes) <= limit else None
+
+# the Last-Event-ID a reconnecting client sent, or None
+def last_event_id():
+    value = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+# the sequence number a stream starts from and the changes to replay first
+# (None when they can't all be replayed)
+def stream_start(session, user_id, since, limit):
+    start_seq = latest_change_seq(session)
+    if since is None or since >= start_seq:
+        return max(start_seq, since or 0), []
+    return start_seq, replay_changes(session, user_id, since, limit)
+
+# the first messages of a stream and the last sequence number they cover
+def format_start(start_seq, backlog):
+    messages = [f'retry: {RECONNECT_DELAY_MS}\n\n']
+    last_seq = start_seq
+    if backlog is None:
+        messages.append(format_resync(start_seq))
+    else:
+        for change in backlog:
+            messages.append(format_change(change))
+            last_seq = max(last_seq, change.seq)
+    return ''.join(messages), last_seq
+
+def event_stream_response(body):
+    return Response(body, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def too_many_streams_response():
+    response = jsonify({
+        'success': False,
+        'message': 'Too many open event streams, try again later'
+    })
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
+# The ASGI server (asgi.py) keeps the stream open from an async handler, see
+# routes/async_task_events.py. Under a WSGI server an open stream would hold
+# a worker thread, so this view answers with what is already in the log and
+# closes. The trailing id moves the client's Last-Event-ID on, and the
+# browser reconnects after the retry delay to pick up from there.
+# EventSource cannot send headers, so the token may also come as ?jwt=
+@events_bp.route('/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_task_events():
+    try:
+        current_user_id = get_jwt_identity()
+        start_seq, backlog = stream_start(db.session, current_user_id, last_event_id(),
+                                          current_app.config['EVENTS_BUFFER_SIZE'])
+        body, last_seq = format_start(start_seq, backlog)
+        return event_stream_response(f'{body}id: {last_seq}\n\n')
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error while opening the event stream'
+        }), 500
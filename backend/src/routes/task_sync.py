@@ -0,0 +1,81 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.task_change_horizon import TaskChangeHorizon
+from services.task_changes import fetch_changes
+from database import db
+
+sync_bp = Blueprint('task_sync', __name__)
+
+# Default and largest page of changes
+CHANGES_DEFAULT_LIMIT = 100
+CHANGES_MAX_LIMIT = 1000
+
+# read a non-negative integer query parameter, raising ValueError otherwise
+def parse_sequence_arg(name, default):
+    value = int(request.args.get(name, default))
+    if value < 0:
+        raise ValueError(name)
+    return value
+
+@sync_bp.route('/changes', methods=['GET'])
+@jwt_required()
+def get_task_changes():
+    return get_task_changes_response(db.session)
+
+# one page of the change feed; routes/async_tasks.py runs it on an aiosqlite session
+def get_task_changes_response(session):
+    try:
+        current_user_id = get_jwt_identity()
+        
+        errors = []
+        try:
+            since = parse_sequence_arg('since', 0)
+        except ValueError:
+            errors.append({'field': 'since', 'message': 'since must be a non-negative integer'})
+        try:
+            limit = min(max(parse_sequence_arg('limit', CHANGES_DEFAULT_LIMIT), 1), CHANGES_MAX_LIMIT)
+        except ValueError:
+            errors.append({'field': 'limit', 'message': 'limit must be a non-negative integer'})
+        if errors:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': errors
+            }), 400
+        
+        # Tombstones older than the cursor may have been pruned; the client must start over
+        horizon = session.get(TaskChangeHorizon, current_user_id)
+        if since and horizon and since < horizon.seq:
+            return jsonify({
+                'success': False,
+                'message': 'Cursor is too old, resync from since=0'
+            }), 410
+        
+        # A full sync only needs the tasks that still exist
+        rows = fetch_changes(session, since, limit + 1, user_id=current_user_id, include_deleted=bool(since))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        # Once caught up, never hand out a cursor behind the horizon
+        cursor = rows[-1].seq if rows else since
+        if not has_more and horizon:
+            cursor = max(cursor, horizon.seq)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'changes': [
+                    {'type': 'delete', 'id': change.task_id} if change.task is None
+                    else {'type': 'upsert', 'id': change.task_id, 'task': change.task}
+                    for change in rows
+                ],
+                'cursor': str(cursor),
+                'hasMore': has_more
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error while fetching task changes'
+        }), 500
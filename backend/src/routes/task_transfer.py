@@ -0,0 +1,215 @@
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import EXCLUDE, ValidationError
+from collections import Counter, defaultdict
+from datetime import datetime
+import codecs
+import csv
+import io
+import json
+from models.task import Task
+from models.task_stats import TaskStats
+from models.task_completion_rollup import TaskCompletionRollup
+from routes.tasks import build_task_query, task_schema
+from services.task_analytics import apply_rollup_deltas, count_completion
+from services.task_stats import apply_stats_deltas, count_task
+from database import db
+
+transfer_bp = Blueprint('task_transfer', __name__)
+
+# Columns of a CSV export, in the order of Task.to_dict()
+CSV_FIELDS = ['id', 'title', 'description', 'priority', 'status', 'dueDate',
+              'completedAt', 'userId', 'createdAt', 'updatedAt']
+
+EXPORT_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# serialize tasks as newline-delimited JSON, one chunk per DB batch
+def generate_ndjson(tasks, chunk_size):
+    lines = []
+    for task in tasks:
+        lines.append(json.dumps(task.to_dict(), separators=(',', ':')))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+# serialize tasks as CSV with a header row, one chunk per DB batch
+def generate_csv(tasks, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    
+    rows = 0
+    for task in tasks:
+        writer.writerow(task.to_dict())
+        rows += 1
+        if rows >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    yield buffer.getvalue()
+
+@transfer_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_tasks():
+    try:
+        current_user_id = get_jwt_identity()
+        export_format = request.args.get('format', 'ndjson')
+        
+        if export_format not in EXPORT_MIMETYPES:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': [{'field': 'format', 'message': 'Format must be one of ndjson, csv'}]
+            }), 400
+        
+        # Fetch in fixed-size batches so memory stays flat however many tasks there are
+        chunk_size = current_app.config['TASK_EXPORT_CHUNK_SIZE']
+        query = build_task_query(
+            current_user_id,
+            request.args.get('status'),
+            request.args.get('priority'),
+            request.args.get('search')
+        ).order_by(Task.created_at.desc(), Task.id.desc()).yield_per(chunk_size)
+        
+        generate = generate_ndjson if export_format == 'ndjson' else generate_csv
+        return Response(
+            stream_with_context(generate(query, chunk_size)),
+            mimetype=EXPORT_MIMETYPES[export_format],
+            headers={'Content-Disposition': f'attachment; filename=tasks.{export_format}'}
+        )
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error while exporting tasks'
+        }), 500
+
+# Import rows may use the export's camelCase keys or the API's snake_case ones
+IMPORT_FIELD_ALIASES = {'dueDate': 'due_date'}
+
+# yield (row number, parsed object or None, parse error) from an NDJSON stream
+def read_ndjson(stream):
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line), None
+        except ValueError:
+            yield number, None, 'Invalid JSON'
+
+# yield (row number, parsed row, parse error) from a CSV stream with a header row
+def read_csv(stream):
+    for number, row in enumerate(csv.DictReader(stream), start=1):
+        # Empty cells mean "not set" rather than an empty string
+        yield number, {key: value for key, value in row.items() if value not in ('', None)}, None
+
+# validate one imported row and turn it into insert parameters. Rows go
+# through the POST /api/tasks/ schema but not validate_due_date: past due
+# dates are accepted, so exported overdue and completed tasks re-import.
+def load_import_row(row, user_id):
+    if not isinstance(row, dict):
+        raise ValidationError({'row': ['Row must be an object']})
+    row = {IMPORT_FIELD_ALIASES.get(key, key): value for key, value in row.items()}
+    data = task_schema.load(row, unknown=EXCLUDE)
+    status = data.get('status', 'pending')
+    now = datetime.utcnow()
+    return {
+        'title': data['title'],
+        'user_id': user_id,
+        'description': data.get('description'),
+        'priority': data.get('priority', 'medium'),
+        'status': status,
+        'due_date': data.get('due_date'),
+        # Completed rows count as completed on import, as Task.update_status would
+        'completed_at': now if status == 'completed' else None,
+        'created_at': now
+    }
+
+# insert one batch with executemany and keep the user's stats and rollup rows in step
+def insert_import_batch(rows, user_id):
+    deltas = defaultdict(Counter)
+    rollup_deltas = defaultdict(Counter)
+    for row in rows:
+        count_task(deltas, user_id, row['status'], row['priority'], 1)
+        count_completion(rollup_deltas, user_id, row['priority'], row['created_at'], row['completed_at'], 1)
+    deltas[user_id]['version'] = 1
+    
+    db.session.execute(Task.__table__.insert(), rows)
+    apply_stats_deltas(db.session.connection(bind_arguments={'mapper': TaskStats.__mapper__}), deltas)
+    apply_rollup_deltas(db.session.connection(bind_arguments={'mapper': TaskCompletionRollup.__mapper__}), rollup_deltas)
+    db.session.commit()
+
+@transfer_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_tasks():
+    current_user_id = get_jwt_identity()
+    import_format = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+    
+    if import_format not in EXPORT_MIMETYPES:
+        return jsonify({
+            'success': False,
+            'message': 'Validation failed',
+            'errors': [{'field': 'format', 'message': 'Format must be one of ndjson, csv'}]
+        }), 400
+    
+    batch_size = current_app.config['TASK_IMPORT_BATCH_SIZE']
+    max_errors = current_app.config['TASK_IMPORT_MAX_ERRORS']
+    accepted = rejected = 0
+    errors = []
+    batch = []
+    
+    try:
+        # Read the body line by line so memory use does not depend on the upload size.
+        # WSGI servers may hand over their raw input object, so only rely on iteration.
+        stream = codecs.iterdecode(request.stream, 'utf-8')
+        reader = read_ndjson(stream) if import_format == 'ndjson' else read_csv(stream)
+        
+        for number, row, parse_error in reader:
+            try:
+                if parse_error:
+                    raise ValidationError({'row': [parse_error]})
+                batch.append(load_import_row(row, current_user_id))
+            except ValidationError as e:
+                rejected += 1
+                if len(errors) < max_errors:
+                    errors.append({
+                        'row': number,
+                        'errors': [{'field': field, 'message': messages} for field, messages in e.messages.items()]
+                    })
+                continue
+            
+            if len(batch) >= batch_size:
+                insert_import_batch(batch, current_user_id)
+                accepted += len(batch)
+                batch = []
+        
+        if batch:
+            insert_import_batch(batch, current_user_id)
+            accepted += len(batch)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Import finished',
+            'data': {
+                'accepted': accepted,
+                'rejected': rejected,
+                'errors': errors,
+                'errorsTruncated': rejected > len(errors)
+            }
+        })
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'Server error while importing tasks',
+            'data': {
+                'accepted': accepted
+            }
+        }), 500
@@ -1,32 +1,193 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from marshmallow import Schema, fields, ValidationError
-from sqlalchemy import or_, func
-from datetime import datetime
+from marshmallow import Schema, fields, ValidationError, validate
+from sqlalchemy import or_, func, literal_column, tuple_
+from datetime import date, datetime, timedelta, timezone
+import base64
+import binascii
+import json
 from models.task import Task
 from models.user import User
+from models.task_stats import TaskStats
+from models.task_completion_rollup import TaskCompletionRollup
+from services import task_analytics, task_search
+from services.etags import task_version_etag
+from services.group_commit import GroupCommitTimeout, run_task_write
+from services.task_rows import ALL_TASK_FIELDS, compile_task_mapper, parse_fields, select_fields, task_columns
 from database import db
 
 tasks_bp = Blueprint('tasks', __name__)
 
+# Field validators, shared by both schemas; they keep marshmallow's
+# generic message so validation errors read as before
+INVALID_VALUE = 'Invalid value.'
+validate_title = validate.Length(min=1, max=200, error=INVALID_VALUE)
+validate_description = validate.Length(max=1000, error=INVALID_VALUE)
+validate_priority = validate.OneOf(('low', 'medium', 'high'), error=INVALID_VALUE)
+validate_status = validate.OneOf(('pending', 'in-progress', 'completed'), error=INVALID_VALUE)
+
 # Validation schemas
 class TaskSchema(Schema):
-    title = fields.Str(required=True, validate=lambda x: len(x) >= 1 and len(x) <= 200)
-    description = fields.Str(allow_none=True, validate=lambda x: len(x) <= 1000 if x else True)
-    priority = fields.Str(validate=lambda x: x in ['low', 'medium', 'high'], missing='medium')
-    status = fields.Str(validate=lambda x: x in ['pending', 'in-progress', 'completed'], missing='pending')
+    title = fields.Str(required=True, validate=validate_title)
+    description = fields.Str(allow_none=True, validate=validate_description)
+    priority = fields.Str(validate=validate_priority, missing='medium')
+    status = fields.Str(validate=validate_status, missing='pending')
     due_date = fields.DateTime(allow_none=True, format='iso')
 
 class TaskUpdateSchema(Schema):
-    title = fields.Str(validate=lambda x: len(x) >= 1 and len(x) <= 200, missing=None)
-    description = fields.Str(allow_none=True, validate=lambda x: len(x) <= 1000 if x else True, missing=None)
-    priority = fields.Str(validate=lambda x: x in ['low', 'medium', 'high'], missing=None)
-    status = fields.Str(validate=lambda x: x in ['pending', 'in-progress', 'completed'], missing=None)
+    title = fields.Str(validate=validate_title, missing=None)
+    description = fields.Str(allow_none=True, validate=validate_description, missing=None)
+    priority = fields.Str(validate=validate_priority, missing=None)
+    status = fields.Str(validate=validate_status, missing=None)
     due_date = fields.DateTime(allow_none=True, format='iso', missing=None)
 
+# Schema instances are stateless once built, so one of each serves every
+# request instead of copying the declared fields per request
+task_schema = TaskSchema()
+task_update_schema = TaskUpdateSchema()
+
+# encode a task's (timestamp, id) position, e.g. (createdAt, id), as an opaque cursor
+def encode_cursor(created_at, task_id):
+    raw = json.dumps([created_at, task_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+# decode a cursor produced by encode_cursor, raising ValueError if malformed
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(task_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError('Invalid cursor') from e
+
+# parse a boolean query parameter such as includeTotal=false
+def parse_bool_arg(name, default):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'false', 'no', 'off')
+
+# parse an ISO 8601 date or datetime query parameter as naive UTC,
+# raising ValueError if malformed
+def parse_datetime_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+# parse an ISO 8601 date query parameter, recording a validation error when missing or malformed
+def parse_date_arg(name, errors):
+    value = request.args.get(name)
+    if not value:
+        errors.append({'field': name, 'message': 'Date is required'})
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        errors.append({'field': name, 'message': 'Must be an ISO 8601 date'})
+        return None
+
+# read the dueBefore/dueAfter/overdue filters, returning (filters, errors)
+def parse_due_filters():
+    filters, errors = {}, []
+    for arg, key in (('dueBefore', 'due_before'), ('dueAfter', 'due_after')):
+        try:
+            filters[key] = parse_datetime_arg(arg)
+        except ValueError:
+            errors.append({'field': arg, 'message': 'Must be an ISO 8601 date or datetime'})
+    filters['overdue'] = parse_bool_arg('overdue', False)
+    return filters, errors
+
+# read the fields= sparse fieldset, recording a validation error for unknown names
+def parse_fields_arg(errors):
+    try:
+        return parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        errors.append({'field': 'fields', 'message': str(e)})
+        return ALL_TASK_FIELDS
+
+# tasks that are not completed; the literal lets SQLite match this against
+# the WHERE clause of the partial index ix_tasks_user_due_open
+def open_task_filter():
+    return Task.status != literal_column("'completed'")
+
+# build the filtered task query shared by the list endpoints, on the app's
+# session unless another is given
+def build_task_query(user_id, status=None, priority=None, search=None, ranked=False,
+                     due_before=None, due_after=None, overdue=False, session=None):
+    query = (Task.query if session is None else session.query(Task)).filter_by(user_id=user_id)
+    
+    if status:
+        query = query.filter(Task.status == status)
+    if priority:
+        query = query.filter(Task.priority == priority)
+    if due_after:
+        query = query.filter(Task.due_date >= due_after)
+    if due_before:
+        query = query.filter(Task.due_date < due_before)
+    if overdue:
+        query = query.filter(open_task_filter(), Task.due_date < datetime.utcnow())
+    if search:
+        # Prefer the FTS5 index; fall back to substring matching without it
+        matched = task_search.apply_search(query, search, user_id)
+        if matched is not None:
+            query = matched.order_by(task_search.rank_order()) if ranked else matched
+        else:
+            query = query.filter(
+                or_(
+                    Task.title.ilike(f'%{search}%'),
+                    Task.description.ilike(f'%{search}%')
+                )
+            )
+    
+    return query
+
+# check that a new task's due date is not in the past
+def validate_due_date(data):
+    if data.get('due_date') and data['due_date'] < datetime.utcnow():
+        return [{'field': 'due_date', 'message': 'Due date cannot be in the past'}]
+    return []
+
+# create a task from data loaded by TaskSchema
+def build_task(data, user_id):
+    return Task(
+        title=data['title'],
+        user_id=user_id,
+        description=data.get('description'),
+        priority=data.get('priority', 'medium'),
+        status=data.get('status', 'pending'),
+        due_date=data.get('due_date')
+    )
+
+# apply the fields loaded by TaskUpdateSchema to a task
+def apply_task_update(task, data):
+    if data.get('title') is not None:
+        task.title = data['title']
+    if data.get('description') is not None:
+        task.description = data['description']
+    if data.get('priority') is not None:
+        task.priority = data['priority']
+    if data.get('status') is not None:
+        task.update_status(data['status'])
+    if data.get('due_date') is not None:
+        task.due_date = data['due_date']
+    
+    task.updated_at = datetime.utcnow()
+
 @tasks_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_tasks():
+    return get_tasks_response(db.session)
+
+# The *_response handlers take the session to query and build the whole
+# response. The views here pass db.session; routes/async_tasks.py runs the
+# same handlers on an aiosqlite session.
+
+@task_version_etag
+def get_tasks_response(session):
     try:
         current_user_id = get_jwt_identity()
         
@@ -34,58 +195,222 @@ def get_tasks():
         status = request.args.get('status')
         priority = request.args.get('priority')
         search = request.args.get('search')
-        page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 10))
         
-        # Build query
-        query = Task.query.filter_by(user_id=current_user_id)
+        due_filters, errors = parse_due_filters()
+        fields = parse_fields_arg(errors)
+        if errors:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': errors
+            }), 400
         
-        # Apply filters
-        if status:
-            query = query.filter(Task.status == status)
-        if priority:
-            query = query.filter(Task.priority == priority)
-        if search:
-            query = query.filter(
-                or_(
-                    Task.title.ilike(f'%{search}%'),
-                    Task.description.ilike(f'%{search}%')
-                )
-            )
+        # Cursor mode pages on (created_at, id) instead of an offset
+        if 'cursor' in request.args:
+            query = build_task_query(current_user_id, status, priority, search, session=session, **due_filters)
+            return get_tasks_by_cursor(query, request.args['cursor'], limit, fields)
+        
+        # Build query, with the best search matches first
+        query = build_task_query(current_user_id, status, priority, search, ranked=True,
+                                 session=session, **due_filters)
+        
+        page = int(request.args.get('page', 1))
+        include_total = parse_bool_arg('includeTotal', True)
         
         # Apply pagination
         offset = (page - 1) * limit
-        total = query.count()
-        tasks = query.order_by(Task.created_at.desc()).offset(offset).limit(limit).all()
+        rows = query.with_entities(*task_columns(fields)).order_by(
+            Task.created_at.desc(), Task.id.desc()
+        ).offset(offset).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        
+        # Serialize plain row tuples instead of hydrating Task instances
+        to_dict = compile_task_mapper(fields)
+        tasks = [to_dict(row) for row in rows[:limit]]
+        
+        pagination = {
+            'page': page,
+            'limit': limit,
+            'hasMore': has_more
+        }
+        if include_total:
+            total = query.order_by(None).count()
+            pagination['total'] = total
+            pagination['totalPages'] = (total + limit - 1) // limit
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'tasks': tasks,
+                'pagination': pagination
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error while fetching tasks'
+        }), 500
+
+# keyset pagination: fetch the page of tasks after the given cursor
+def get_tasks_by_cursor(query, cursor, limit, fields=ALL_TASK_FIELDS):
+    include_total = parse_bool_arg('includeTotal', False)
+    total = query.order_by(None).count() if include_total else None
+    
+    if cursor:
+        try:
+            created_at, task_id = decode_cursor(cursor)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': [{'field': 'cursor', 'message': 'Invalid cursor'}]
+            }), 400
+        query = query.filter(tuple_(Task.created_at, Task.id) < (created_at, task_id))
+    
+    # The cursor needs createdAt even when the client didn't ask for it
+    columns = select_fields(fields, 'createdAt')
+    rows = query.with_entities(*task_columns(columns)).order_by(
+        Task.created_at.desc(), Task.id.desc()
+    ).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    
+    to_dict = compile_task_mapper(fields)
+    tasks = [to_dict(row) for row in rows[:limit]]
+    
+    last = compile_task_mapper(columns)(rows[limit - 1]) if has_more else None
+    pagination = {
+        'limit': limit,
+        'hasMore': has_more,
+        'nextCursor': encode_cursor(last['createdAt'], last['id']) if has_more else None
+    }
+    if include_total:
+        pagination['total'] = total
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'tasks': tasks,
+            'pagination': pagination
+        }
+    })
+
+@tasks_bp.route('/due', methods=['GET'])
+@jwt_required()
+def get_due_tasks():
+    return get_due_tasks_response(db.session)
+
+def get_due_tasks_response(session):
+    try:
+        current_user_id = get_jwt_identity()
+        limit = int(request.args.get('limit', 20))
+        now = datetime.utcnow()
+        
+        errors = []
+        try:
+            due_after = parse_datetime_arg('after')
+        except ValueError:
+            errors.append({'field': 'after', 'message': 'Must be an ISO 8601 date or datetime'})
+        try:
+            due_before = parse_datetime_arg('before')
+        except ValueError:
+            errors.append({'field': 'before', 'message': 'Must be an ISO 8601 date or datetime'})
+        try:
+            days = int(request.args['days']) if request.args.get('days') else None
+        except ValueError:
+            errors.append({'field': 'days', 'message': 'Days must be an integer'})
+        fields = parse_fields_arg(errors)
+        if errors:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': errors
+            }), 400
+        
+        # overdue=true: past due; days=N: due from now until N days ahead
+        if parse_bool_arg('overdue', False):
+            due_before = now
+        elif days is not None:
+            due_after = due_after or now
+            due_before = now + timedelta(days=days)
+        
+        # Open tasks with a due date, soonest first: a range scan of ix_tasks_user_due_open
+        query = session.query(Task).filter(
+            Task.user_id == current_user_id,
+            open_task_filter(),
+            Task.due_date.isnot(None)
+        )
+        if due_after:
+            query = query.filter(Task.due_date >= due_after)
+        if due_before:
+            query = query.filter(Task.due_date < due_before)
+        
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                due_date, task_id = decode_cursor(cursor)
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'message': 'Validation failed',
+                    'errors': [{'field': 'cursor', 'message': 'Invalid cursor'}]
+                }), 400
+            query = query.filter(tuple_(Task.due_date, Task.id) > (due_date, task_id))
+        
+        columns = select_fields(fields, 'dueDate')
+        rows = query.with_entities(*task_columns(columns)).order_by(
+            Task.due_date, Task.id
+        ).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        
+        to_dict = compile_task_mapper(fields)
+        tasks = [to_dict(row) for row in rows[:limit]]
+        last = compile_task_mapper(columns)(rows[limit - 1]) if has_more else None
         
         return jsonify({
             'success': True,
             'data': {
-                'tasks': [task.to_dict() for task in tasks],
+                'tasks': tasks,
                 'pagination': {
-                    'total': total,
-                    'page': page,
                     'limit': limit,
-                    'totalPages': (total + limit - 1) // limit
+                    'hasMore': has_more,
+                    'nextCursor': encode_cursor(last['dueDate'], last['id']) if has_more else None
                 }
             }
         })
-        
+    
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': 'Server error while fetching tasks'
+            'message': 'Server error while fetching due tasks'
         }), 500
 
 @tasks_bp.route('/<task_id>', methods=['GET'])
 @jwt_required()
 def get_task(task_id):
+    return get_task_response(db.session, task_id)
+
+@task_version_etag
+def get_task_response(session, task_id):
     try:
         current_user_id = get_jwt_identity()
         
-        task = Task.query.filter_by(id=task_id, user_id=current_user_id).first()
+        errors = []
+        fields = parse_fields_arg(errors)
+        if errors:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': errors
+            }), 400
+        
+        # Select only the requested columns
+        row = session.query(Task).filter_by(id=task_id, user_id=current_user_id).with_entities(
+            *task_columns(fields)
+        ).first()
         
-        if not task:
+        if not row:
             return jsonify({
                 'success': False,
                 'message': 'Task not found'
@@ -94,55 +419,65 @@ def get_task(task_id):
         return jsonify({
             'success': True,
             'data': {
-                'task': task.to_dict()
+                'task': compile_task_mapper(fields)(row)
             }
         })
-        
+    
     except Exception as e:
         return jsonify({
             'success': False,
             'message': 'Server error while fetching task'
         }), 500
 
+# 503 for a write that timed out waiting for the group committer
+def group_commit_busy_response():
+    response = jsonify({
+        'success': False,
+        'message': 'Server is busy, please try again shortly'
+    })
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @tasks_bp.route('/', methods=['POST'])
 @jwt_required()
 def create_task():
+    return create_task_response(db.session)
+
+def create_task_response(session):
     try:
         current_user_id = get_jwt_identity()
         
         # Validate request data
-        schema = TaskSchema()
-        data = schema.load(request.json)
+        data = task_schema.load(request.json)
         
         # Validate due date is not in the past
-        if data.get('due_date') and data['due_date'] < datetime.utcnow():
+        due_date_errors = validate_due_date(data)
+        if due_date_errors:
             return jsonify({
                 'success': False,
                 'message': 'Validation failed',
-                'errors': [{'field': 'due_date', 'message': 'Due date cannot be in the past'}]
+                'errors': due_date_errors
             }), 400
         
         # Create new task
-        task = Task(
-            title=data['title'],
-            user_id=current_user_id,
-            description=data.get('description'),
-            priority=data.get('priority', 'medium'),
-            status=data.get('status', 'pending'),
-            due_date=data.get('due_date')
-        )
+        def create():
+            task = build_task(data, current_user_id)
+            session.add(task)
+            session.flush()
+            return task.to_dict()
         
-        db.session.add(task)
-        db.session.commit()
+        task = run_task_write(session, current_user_id, create)
         
         return jsonify({
             'success': True,
             'message': 'Task created successfully',
             'data': {
-                'task': task.to_dict()
+                'task': task
             }
         }), 201
-        
+    
+    except GroupCommitTimeout:
+        return group_commit_busy_response()
     except ValidationError as e:
         return jsonify({
             'success': False,
@@ -150,7 +485,7 @@ def create_task():
             'errors': [{'field': field, 'message': errors} for field, errors in e.messages.items()]
         }), 400
     except Exception as e:
-        db.session.rollback()
+        session.rollback()
         return jsonify({
             'success': False,
             'message': 'Server error while creating task'
@@ -159,46 +494,46 @@ def create_task():
 @tasks_bp.route('/<task_id>', methods=['PUT'])
 @jwt_required()
 def update_task(task_id):
+    return update_task_response(db.session, task_id)
+
+def update_task_response(session, task_id):
     try:
         current_user_id = get_jwt_identity()
-        
-        # Find task
-        task = Task.query.filter_by(id=task_id, user_id=current_user_id).first()
-        
-        if not task:
+        payload = request.json
+        
+        # Runs in the group committer's transaction when GROUP_COMMIT is on
+        def update():
+            # Find task
+            task = session.query(Task).filter_by(id=task_id, user_id=current_user_id).first()
+            if not task:
+                return None
+            
+            # Validate request data
+            data = task_update_schema.load(payload)
+            
+            # Update task fields
+            apply_task_update(task, data)
+            session.flush()
+            return task.to_dict()
+        
+        task = run_task_write(session, current_user_id, update)
+        
+        if task is None:
             return jsonify({
                 'success': False,
                 'message': 'Task not found'
             }), 404
         
-        # Validate request data
-        schema = TaskUpdateSchema()
-        data = schema.load(request.json)
-        
-        # Update task fields
-        if data.get('title') is not None:
-            task.title = data['title']
-        if data.get('description') is not None:
-            task.description = data['description']
-        if data.get('priority') is not None:
-            task.priority = data['priority']
-        if data.get('status') is not None:
-            task.update_status(data['status'])
-        if data.get('due_date') is not None:
-            task.due_date = data['due_date']
-        
-        task.updated_at = datetime.utcnow()
-        
-        db.session.commit()
-        
         return jsonify({
             'success': True,
             'message': 'Task updated successfully',
             'data': {
-                'task': task.to_dict()
+                'task': task
             }
         })
-        
+    
+    except GroupCommitTimeout:
+        return group_commit_busy_response()
     except ValidationError as e:
         return jsonify({
             'success': False,
@@ -206,7 +541,7 @@ def update_task(task_id):
             'errors': [{'field': field, 'message': errors} for field, errors in e.messages.items()]
         }), 400
     except Exception as e:
-        db.session.rollback()
+        session.rollback()
         return jsonify({
             'success': False,
             'message': 'Server error while updating task'
@@ -215,64 +550,212 @@ def update_task(task_id):
 @tasks_bp.route('/<task_id>', methods=['DELETE'])
 @jwt_required()
 def delete_task(task_id):
+    return delete_task_response(db.session, task_id)
+
+def delete_task_response(session, task_id):
     try:
         current_user_id = get_jwt_identity()
         
-        # Find task
-        task = Task.query.filter_by(id=task_id, user_id=current_user_id).first()
+        def delete():
+            # Find task
+            task = session.query(Task).filter_by(id=task_id, user_id=current_user_id).first()
+            if not task:
+                return False
+            session.delete(task)
+            session.flush()
+            return True
         
-        if not task:
+        if not run_task_write(session, current_user_id, delete):
             return jsonify({
                 'success': False,
                 'message': 'Task not found'
             }), 404
         
-        db.session.delete(task)
-        db.session.commit()
-        
         return jsonify({
             'success': True,
             'message': 'Task deleted successfully'
         })
+    
+    except GroupCommitTimeout:
+        return group_commit_busy_response()
+    except Exception as e:
+        session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'Server error while deleting task'
+        }), 500
+
+@tasks_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch_tasks():
+    try:
+        current_user_id = get_jwt_identity()
+        payload = request.json
+        operations = payload.get('operations') if isinstance(payload, dict) else None
+        max_size = current_app.config['TASK_BATCH_MAX_SIZE']
+        
+        if not isinstance(operations, list) or not operations:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': [{'field': 'operations', 'message': 'Operations must be a non-empty list'}]
+            }), 400
+        if len(operations) > max_size:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': [{'field': 'operations', 'message': f'A batch can contain at most {max_size} operations'}]
+            }), 400
         
+        # Resolve ownership of every referenced task with a single IN query
+        task_ids = {str(op['id']) for op in operations
+                    if isinstance(op, dict) and op.get('op') in ('update', 'delete') and op.get('id')}
+        tasks = {}
+        if task_ids:
+            tasks = {task.id: task for task in Task.query.filter(
+                Task.user_id == current_user_id, Task.id.in_(task_ids)
+            )}
+        
+        results = [apply_batch_operation(op, tasks, current_user_id) for op in operations]
+        
+        # Flush so generated ids and timestamps can be serialized before the single commit
+        db.session.flush()
+        for result in results:
+            task = result.pop('_task', None)
+            if task is not None:
+                result['task'] = task.to_dict()
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Batch processed',
+            'data': {
+                'results': results
+            }
+        })
+    
     except Exception as e:
         db.session.rollback()
         return jsonify({
             'success': False,
-            'message': 'Server error while deleting task'
+            'message': 'Server error while processing batch'
         }), 500
 
+# stage one batch operation in the session and describe its outcome
+def apply_batch_operation(operation, tasks, user_id):
+    if not isinstance(operation, dict) or operation.get('op') not in ('create', 'update', 'delete'):
+        return {
+            'status': 400,
+            'message': 'Validation failed',
+            'errors': [{'field': 'op', 'message': 'Operation must be one of create, update, delete'}]
+        }
+    
+    op = operation['op']
+    result = {'op': op}
+    
+    if op == 'create':
+        try:
+            data = task_schema.load(operation.get('data') or {})
+        except ValidationError as e:
+            return {**result, 'status': 400, 'message': 'Validation failed',
+                    'errors': [{'field': field, 'message': errors} for field, errors in e.messages.items()]}
+        due_date_errors = validate_due_date(data)
+        if due_date_errors:
+            return {**result, 'status': 400, 'message': 'Validation failed', 'errors': due_date_errors}
+        
+        task = build_task(data, user_id)
+        db.session.add(task)
+        return {**result, 'status': 201, '_task': task}
+    
+    task = tasks.get(str(operation.get('id')))
+    result['id'] = operation.get('id')
+    if task is None:
+        return {**result, 'status': 404, 'message': 'Task not found'}
+    
+    if op == 'update':
+        try:
+            data = task_update_schema.load(operation.get('data') or {})
+        except ValidationError as e:
+            return {**result, 'status': 400, 'message': 'Validation failed',
+                    'errors': [{'field': field, 'message': errors} for field, errors in e.messages.items()]}
+        apply_task_update(task, data)
+        return {**result, 'status': 200, '_task': task}
+    
+    # A deleted task cannot be referenced again later in the same batch
+    del tasks[task.id]
+    db.session.delete(task)
+    return {**result, 'status': 200}
+
 @tasks_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_task_stats():
+    return get_task_stats_response(db.session)
+
+@task_version_etag
+def get_task_stats_response(session):
     try:
         current_user_id = get_jwt_identity()
         
-        # Get task counts by status
-        stats = db.session.query(
-            Task.status,
-            func.count(Task.id).label('count')
-        ).filter_by(user_id=current_user_id).group_by(Task.status).all()
-        
-        # Format stats
-        formatted_stats = {
-            'pending': 0,
-            'in-progress': 0,
-            'completed': 0
-        }
-        
-        for stat in stats:
-            formatted_stats[stat.status] = stat.count
+        # Counters are maintained on every task write, so this is a primary-key read
+        stats = session.get(TaskStats, current_user_id) or TaskStats(user_id=current_user_id)
         
         return jsonify({
             'success': True,
             'data': {
-                'stats': formatted_stats
+                'stats': stats.status_counts(),
+                'byPriority': stats.priority_counts()
             }
         })
-        
+    
     except Exception as e:
         return jsonify({
             'success': False,
             'message': 'Server error while fetching task statistics'
-        }), 500 
\ No newline at end of file
+        }), 500
+
+@tasks_bp.route('/analytics', methods=['GET'])
+@jwt_required()
+def get_task_analytics():
+    return get_task_analytics_response(db.session)
+
+@task_version_etag
+def get_task_analytics_response(session):
+    try:
+        current_user_id = get_jwt_identity()
+        
+        # Date range (inclusive, UTC days of completion) and bucket size
+        errors = []
+        start = parse_date_arg('from', errors)
+        end = parse_date_arg('to', errors)
+        interval = request.args.get('interval', 'day')
+        if interval not in task_analytics.INTERVALS:
+            errors.append({'field': 'interval', 'message': f"Interval must be one of {', '.join(task_analytics.INTERVALS)}"})
+        if start and end and start > end:
+            errors.append({'field': 'from', 'message': 'Must not be after to'})
+        if errors:
+            return jsonify({
+                'success': False,
+                'message': 'Validation failed',
+                'errors': errors
+            }), 400
+        
+        # Rollups are maintained on every task write, so this reads at most
+        # one row per day and priority in the range instead of the tasks
+        rows = session.execute(
+            task_analytics.completion_query(current_user_id, start, end, interval),
+            bind_arguments={'mapper': TaskCompletionRollup.__mapper__}
+        ).all()
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'range': {'from': start.isoformat(), 'to': end.isoformat(), 'interval': interval},
+                **task_analytics.summarize_completions(rows)
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error while fetching task analytics'
+        }), 500
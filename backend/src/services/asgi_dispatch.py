@@ -0,0 +1,210 @@
+import asyncio
+import contextvars
+import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from urllib.parse import quote
+from a2wsgi import WSGIMiddleware
+from flask.signals import request_started
+from flask_jwt_extended import verify_jwt_in_request
+from werkzeug.exceptions import HTTPException
+from services.token_revocation import get_revocation_list
+
+# async counterpart of @jwt_required(): same options, token checks and error
+# handlers. A due refresh of the revocation list reads the database, so it
+# runs in a thread before the token is checked.
+def async_jwt_required(**options):
+    def decorator(handler):
+        @wraps(handler)
+        async def wrapper(*args, **kwargs):
+            revocations = get_revocation_list()
+            if revocations.refresh_due():
+                await asyncio.to_thread(revocations.refresh)
+            verify_jwt_in_request(**options)
+            return await handler(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# WSGI environ for an ASGI HTTP scope and its buffered body
+def build_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': quote(scope.get('root_path', '')),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'asgi.scope': scope,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+# return once the client has gone away
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+class AsgiDispatcher:
+    """ASGI app serving selected Flask endpoints from async handlers.
+    
+    `handlers` maps endpoint names (e.g. 'tasks.get_tasks') to coroutine
+    functions taking the URL's view arguments. A request whose URL and method
+    match one of them runs in the event loop inside a regular Flask request
+    context, so before/after request hooks, error handlers, JWT checks,
+    compression and metrics behave as in the sync app. The hooks are sync
+    code (compression, metrics), so they run on a pool of `hook_threads`
+    threads in the request's contextvars context, which the handler then runs
+    in. A handler may return a response whose body is an async iterable; it
+    is sent chunk by chunk until it ends or the client disconnects.
+    Everything else (unmatched URLs, redirects, streamed and bulk endpoints)
+    goes to the Flask app itself on a pool of `wsgi_threads` threads.
+    """
+    
+    def __init__(self, app, handlers, wsgi_threads, hook_threads, on_shutdown=None):
+        self.app = app
+        self.handlers = handlers
+        self.wsgi = WSGIMiddleware(app, workers=wsgi_threads)
+        self.hooks = ThreadPoolExecutor(hook_threads, thread_name_prefix='asgi-hooks')
+        self.on_shutdown = on_shutdown
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        handler, view_args = self.match(scope) if scope['type'] == 'http' else (None, None)
+        if handler is None:
+            return await self.wsgi(scope, receive, send)
+        
+        environ = build_environ(scope, await read_body(receive))
+        response = await self.dispatch(environ, handler, view_args)
+        headers = response.get_wsgi_headers(environ)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in headers.items()],
+        })
+        if hasattr(response.response, '__aiter__'):
+            return await self.stream(response, receive, send)
+        body = b''.join(response.get_app_iter(environ))
+        await send({'type': 'http.response.body', 'body': body})
+    
+    # send an async iterable body as it is produced, then close the response,
+    # which runs its call_on_close callbacks
+    async def stream(self, response, receive, send):
+        chunks = response.response.__aiter__()
+        disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            while True:
+                next_chunk = asyncio.ensure_future(chunks.__anext__())
+                await asyncio.wait({next_chunk, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_chunk.done():
+                    # The client went away while the body was waiting for data
+                    next_chunk.cancel()
+                    await asyncio.wait({next_chunk})
+                    return
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    break
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnect.cancel()
+            await chunks.aclose()
+            response.close()
+    
+    # async handler and view arguments for a request, or (None, None)
+    def match(self, scope):
+        adapter = self.app.url_map.bind('', script_name=scope.get('root_path') or '/')
+        try:
+            endpoint, view_args = adapter.match(scope['path'], scope['method'])
+        # Routing errors and redirects get Flask's own responses
+        except HTTPException:
+            return None, None
+        return self.handlers.get(endpoint), view_args
+    
+    # run an async handler the way Flask's wsgi_app runs a view
+    async def dispatch(self, environ, handler, view_args):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        request_context = self.app.request_context(environ)
+        
+        def run_hooks(func, *args):
+            return loop.run_in_executor(self.hooks, context.run, func, *args)
+        
+        await run_hooks(request_context.push)
+        user_error = None
+        try:
+            rv = await run_hooks(self.start_request)
+            if rv is None:
+                rv = await asyncio.create_task(handler(**view_args), context=context)
+        except Exception as e:
+            rv, user_error = None, e
+        return await run_hooks(self.finish_request, request_context, rv, user_error)
+    
+    # request_started and the before_request hooks
+    def start_request(self):
+        request_started.send(self.app)
+        return self.app.preprocess_request()
+    
+    # error handlers, after_request hooks and teardown; returns the response
+    def finish_request(self, request_context, rv, user_error):
+        app = self.app
+        error = None
+        try:
+            try:
+                if user_error is not None:
+                    rv = app.handle_user_exception(user_error)
+                return app.finalize_request(rv)
+            except Exception as e:
+                error = e
+                return app.handle_exception(e)
+        finally:
+            request_context.pop(error)
+    
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.on_shutdown is not None:
+                    await self.on_shutdown()
+                self.hooks.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
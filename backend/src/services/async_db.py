@@ -0,0 +1,54 @@
+from flask import current_app
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from services.request_metrics import track_engine
+from services.sqlite_profile import apply_sqlite_profile
+from services.sharding import shard_bind_key, user_shard
+
+# Async driver used in place of pysqlite for each engine's database file
+ASYNC_SQLITE_DRIVER = 'sqlite+aiosqlite'
+
+class AsyncDatabase:
+    """aiosqlite engines mirroring the app's sync engines, for the ASGI handlers.
+    
+    There is one async engine per Flask-SQLAlchemy bind (the main database
+    and, with SHARD_COUNT set, each shard), pointing at the same file with the
+    same pool options and SQLite profile. Sessions are plain SQLAlchemy
+    sessions, so the task stats, change log and profile cache listeners run
+    for async writes as they do for sync ones.
+    """
+    
+    def __init__(self, app, engines):
+        self.engines = {}
+        for key, engine in engines.items():
+            async_engine = create_async_engine(
+                engine.url.set(drivername=ASYNC_SQLITE_DRIVER),
+                **app.config['SQLALCHEMY_ENGINE_OPTIONS']
+            )
+            apply_sqlite_profile(async_engine.sync_engine, app.config)
+            if 'request_metrics' in app.extensions:
+                track_engine(async_engine.sync_engine)
+            self.engines[key] = async_engine
+    
+    # session on the database holding users
+    def session(self):
+        return AsyncSession(self.engines[None], expire_on_commit=False)
+    
+    # session on one shard's database, or the main one when unsharded
+    def shard_session(self, shard):
+        key = None if shard is None else shard_bind_key(shard)
+        return AsyncSession(self.engines[key], expire_on_commit=False)
+    
+    # session on the database holding a user's tasks
+    def task_session(self, user_id):
+        return self.shard_session(user_shard(user_id))
+    
+    async def dispose(self):
+        for engine in self.engines.values():
+            await engine.dispose()
+
+def init_async_db(app, engines):
+    app.extensions['async_db'] = AsyncDatabase(app, engines)
+    return app.extensions['async_db']
+
+def get_async_db():
+    return current_app.extensions['async_db']
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+
+class LRUTTLCache:
+    """Bounded least-recently-used cache whose entries also expire after a TTL.
+    
+    All operations take a lock, so one instance can be shared by the threads
+    of a gthread worker. Each key also has a generation that invalidate()
+    moves on: a caller loading a value takes generation(key) first and passes
+    it to set(), which drops the value if the key was invalidated meanwhile,
+    so a stale read can't be cached after the invalidation it raced with.
+    """
+    
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._generations = OrderedDict()
+        self._last_generation = 0
+        self._forgotten_generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    # return the cached value, or None if missing or expired
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    # current generation of a key, to pass to set() after loading its value
+    def generation(self, key):
+        with self._lock:
+            return self._generations.get(key, self._forgotten_generation)
+    
+    # store a value, evicting the least recently used entry when full; with a
+    # generation, only if the key hasn't been invalidated since it was taken
+    def set(self, key, value, generation=None):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key, self._forgotten_generation):
+                return
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    # drop one entry and move its key to a new generation
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._last_generation += 1
+            self._generations[key] = self._last_generation
+            self._generations.move_to_end(key)
+            # Keep as many generations as entries. Keys whose generation was
+            # forgotten report the newest forgotten one, which is never older
+            # than their own, so a set() pending for them is dropped rather
+            # than let through.
+            while len(self._generations) > max(self.maxsize, 1):
+                _, self._forgotten_generation = self._generations.popitem(last=False)
+    
+    # drop every entry and move every key to a new generation
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._last_generation += 1
+            self._generations.clear()
+            self._forgotten_generation = self._last_generation
+    
+    # hit/miss/eviction counters and current size
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
@@ -0,0 +1,65 @@
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Response types worth compressing
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/plain', 'text/html'}
+
+class ResponseCompressor:
+    """Compresses buffered responses with brotli (when installed) or gzip.
+    
+    The encoding is negotiated from Accept-Encoding, preferring brotli when
+    the client rates both equally. Responses smaller than min_size are sent
+    as is, since the headers and CPU cost outweigh the savings. Streamed
+    responses (exports, event streams) are never compressed here, so they
+    keep flushing row by row.
+    """
+    
+    def __init__(self, min_size, gzip_level, brotli_quality):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+    
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+    
+    def __call__(self, response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES and response.status_code != 304:
+            return response
+        # The body depends on Accept-Encoding whether or not this one is compressed
+        response.vary.add('Accept-Encoding')
+        
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers):
+            return response
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        
+        response.set_data(self.compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        # The compressed body is a different representation of the same data
+        etag, _ = response.get_etag()
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
+
+def init_compression(app):
+    if not app.config['RESPONSE_COMPRESSION']:
+        return
+    app.after_request(ResponseCompressor(
+        app.config['COMPRESSION_MIN_SIZE'],
+        app.config['COMPRESSION_GZIP_LEVEL'],
+        app.config['COMPRESSION_BROTLI_QUALITY']
+    ))
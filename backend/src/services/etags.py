@@ -0,0 +1,62 @@
+import hashlib
+from functools import wraps
+from flask import make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import select
+from models.task_stats import TaskStats
+
+# Query parameters whose results change with the clock rather than with task
+# writes; responses using them get no ETag
+TIME_DEPENDENT_ARGS = ('overdue',)
+
+# statement reading a user's task version
+def task_version_query(user_id):
+    return select(TaskStats.version).where(TaskStats.user_id == user_id)
+
+# current task version for a user; 0 until their first task write
+def get_task_version(session, user_id):
+    return session.execute(task_version_query(user_id)).scalar() or 0
+
+# strong ETag for the current request at a given task version
+def build_task_etag(user_id, version):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{user_id}\0{version}\0{request.path}'.encode())
+    for key, value in sorted(request.args.items(multi=True)):
+        digest.update(f'\0{key}={value}'.encode())
+    return digest.hexdigest()
+
+# whether the current request's results depend on the clock
+def has_time_dependent_args():
+    return any(request.args.get(arg) for arg in TIME_DEPENDENT_ARGS)
+
+# whether the client already holds the representation with this ETag; weak
+# comparison, since compression weakens the ETag it is sent with
+def etag_matches(etag):
+    return request.if_none_match.contains_weak(etag)
+
+# mark a response with its ETag and the caching headers that go with it
+def tag_response(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Authorization')
+    return response
+
+# answer If-None-Match from the user's task version before the handler runs;
+# the handler takes the session to read from as its first argument
+def task_version_etag(handler):
+    @wraps(handler)
+    def wrapper(session, *args, **kwargs):
+        if has_time_dependent_args():
+            return handler(session, *args, **kwargs)
+        
+        user_id = get_jwt_identity()
+        etag = build_task_etag(user_id, get_task_version(session, user_id))
+        
+        if etag_matches(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(handler(session, *args, **kwargs))
+            if response.status_code != 200:
+                return response
+        return tag_response(response, etag)
+    return wrapper
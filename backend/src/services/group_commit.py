@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from flask import current_app
+from database import db
+from models.task import Task
+from services.sharding import use_shard, user_shard
+
+class GroupCommitTimeout(Exception):
+    """Raised when a queued write isn't picked up within GROUP_COMMIT_TIMEOUT."""
+
+class PendingWrite:
+    """One request's mutation, waiting for the transaction it joins to commit."""
+    
+    def __init__(self, shard, apply):
+        self.shard = shard
+        self.apply = apply
+        self.result = None
+        self.error = None
+        self.started = False
+        self.cancelled = False
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+    
+    # claim the write for the writer thread; False if its caller gave up
+    def start(self):
+        with self._lock:
+            if self.cancelled:
+                return False
+            self.started = True
+            return True
+    
+    # finish the write with an error unless it already finished
+    def fail(self, error):
+        if not self.done.is_set():
+            self.result, self.error = None, error
+            self.done.set()
+    
+    # block until the group has committed, then return apply()'s result or
+    # raise what it (or the commit) raised. A write the writer hasn't started
+    # within `timeout` seconds is withdrawn, so nothing of it is written; one
+    # it has started is waited for, since its transaction decides the outcome.
+    def wait(self, timeout):
+        if not self.done.wait(timeout):
+            with self._lock:
+                if not self.started:
+                    self.cancelled = True
+                    raise GroupCommitTimeout()
+            self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class GroupCommitter:
+    """Runs task mutations from concurrent requests in shared transactions.
+    
+    Request threads queue a mutation and wait. A writer thread in each worker
+    process takes everything queued, waiting up to `window` seconds for more
+    (at most max_batch writes), and applies the writes one after another in a
+    single transaction with one commit. That also means one fsync and one
+    trip through SQLite's write lock. Each write runs in its own SAVEPOINT,
+    so one that fails is rolled back on its own and only its caller sees the
+    error. If the commit itself fails, every write in the group fails. With
+    sharding, writes are grouped per shard.
+    """
+    
+    def __init__(self, app, window, max_batch, timeout):
+        self.app = app
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.commits = 0
+        self.writes = 0
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pid = None
+    
+    # queue a mutation and wait for its group to commit; raises
+    # GroupCommitTimeout if the writer doesn't get to it in time
+    def submit(self, shard, apply):
+        pending = PendingWrite(shard, apply)
+        with self._condition:
+            self._ensure_started()
+            self._queue.append(pending)
+            self._condition.notify()
+        return pending.wait(self.timeout)
+    
+    # start the writer in this process; threads do not survive a fork
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+        self._thread.start()
+    
+    # wait for a first write, then gather more until the window closes or
+    # the batch is full
+    def _next_batch(self):
+        with self._condition:
+            while not self._queue:
+                self._condition.wait()
+            deadline = time.monotonic() + self.window
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+    
+    # An error outside a write's own savepoint fails the writes of its batch
+    # that haven't finished; the writer carries on with the next batch
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._next_batch()
+                try:
+                    groups = defaultdict(list)
+                    for pending in batch:
+                        groups[pending.shard].append(pending)
+                    for shard, writes in groups.items():
+                        with use_shard(shard):
+                            self._commit(writes)
+                except Exception as e:
+                    self.app.logger.exception('Group commit failed')
+                    for pending in batch:
+                        pending.fail(e)
+    
+    def _commit(self, writes):
+        applied = []
+        try:
+            # Take the write lock up front; it also makes the SAVEPOINTs
+            # below nest inside one transaction instead of each starting
+            # (and committing) its own
+            connection = db.session.connection(bind_arguments={'mapper': Task.__mapper__})
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+            for pending in writes:
+                # Skip writes whose callers gave up waiting
+                if not pending.start():
+                    continue
+                try:
+                    with db.session.begin_nested():
+                        pending.result = pending.apply()
+                    applied.append(pending)
+                except Exception as e:
+                    pending.error = e
+            db.session.commit()
+            self.commits += 1
+            self.writes += len(applied)
+        except Exception as e:
+            for pending in writes:
+                if pending.error is None:
+                    pending.result, pending.error = None, e
+            db.session.rollback()
+        finally:
+            for pending in writes:
+                pending.done.set()
+            db.session.remove()
+
+def init_group_commit(app):
+    if not app.config['GROUP_COMMIT']:
+        return
+    app.extensions['group_commit'] = GroupCommitter(
+        app,
+        app.config['GROUP_COMMIT_WINDOW_MS'] / 1000,
+        app.config['GROUP_COMMIT_MAX_BATCH'],
+        app.config['GROUP_COMMIT_TIMEOUT']
+    )
+
+# run a task mutation for a user and commit it: through the group committer
+# when GROUP_COMMIT is on and the mutation works on db.session, otherwise in
+# the given session (the ASGI handlers pass their aiosqlite one). apply()
+# works on that session and returns the response; it must not commit.
+def run_task_write(session, user_id, apply):
+    committer = current_app.extensions.get('group_commit')
+    if committer is not None and session is db.session:
+        return committer.submit(user_shard(user_id), apply)
+    result = apply()
+    session.commit()
+    return result
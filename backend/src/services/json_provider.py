@@ -0,0 +1,43 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes responses with orjson when the result is
+    byte-for-byte what the default provider would produce.
+    
+    orjson writes UTF-8 and DEL unescaped, while the stdlib encoder (with
+    ensure_ascii) escapes them, so any such payload is re-encoded with the
+    stdlib. Datetimes, dataclasses and str subclasses are passed through to
+    the default provider's handling; other values orjson rejects (such as
+    non-string keys or very large integers) also fall back to the stdlib.
+    """
+    
+    OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME |
+               orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS) if orjson else 0
+    
+    def response(self, *args, **kwargs):
+        # Pretty-printed (debug) output keeps using the stdlib encoder
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            data = orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        
+        if not data.isascii() or b'\x7f' in data:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(data + b'\n', mimetype=self.mimetype)
+
+# pick the JSON provider named by JSON_PROVIDER ('auto', 'orjson' or 'default')
+def init_json_provider(app):
+    choice = app.config['JSON_PROVIDER']
+    if choice == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_PROVIDER is 'orjson' but orjson is not installed")
+    if choice == 'orjson' or (choice == 'auto' and orjson is not None):
+        app.json = OrjsonProvider(app)
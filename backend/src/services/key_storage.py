@@ -0,0 +1,74 @@
+from sqlalchemy import inspect
+from models.keys import bytes_to_key, key_to_bytes
+from services import task_changes
+
+# Every column holding a user or task id
+KEY_COLUMNS = (
+    ('users', 'id'),
+    ('tasks', 'id'),
+    ('tasks', 'user_id'),
+    ('task_stats', 'user_id'),
+    ('task_changes', 'task_id'),
+    ('task_changes', 'user_id'),
+    ('task_change_horizons', 'user_id'),
+    ('revoked_tokens', 'user_id'),
+    ('task_completion_rollups', 'user_id'),
+)
+
+# KEY_STORAGE values, which are also what SQLite's typeof() reports for a key
+KEY_STORAGES = ('text', 'blob')
+
+def _key_to_blob(value):
+    return key_to_bytes(value) if isinstance(value, str) else value
+
+def _key_to_text(value):
+    return bytes_to_key(value) if isinstance(value, bytes) else value
+
+# warn when the database's keys are not stored the way KEY_STORAGE says;
+# lookups would silently find nothing
+def check_key_storage(app, engine):
+    with engine.connect() as connection:
+        stored = stored_key_storage(connection)
+    if stored and stored != app.config['KEY_STORAGE']:
+        app.logger.warning(
+            "Database keys are stored as %s but KEY_STORAGE is '%s'; run `flask convert-keys %s`",
+            stored, app.config['KEY_STORAGE'], app.config['KEY_STORAGE']
+        )
+
+# how the keys of an existing database are stored, or None if it has no users yet
+def stored_key_storage(connection):
+    if not inspect(connection).has_table('users'):
+        return None
+    stored = connection.exec_driver_sql('SELECT typeof(id) FROM users LIMIT 1').scalar()
+    return stored if stored in KEY_STORAGES else None
+
+# rewrite every id column to the given storage, in place and in the
+# caller's transaction; rows already in the target form are left alone
+def convert_key_storage(connection, storage):
+    if storage not in KEY_STORAGES:
+        raise ValueError(f"Unknown key storage {storage!r}, expected 'text' or 'blob'")
+    
+    dbapi_connection = connection.connection.dbapi_connection
+    dbapi_connection.create_function('key_to_blob', 1, _key_to_blob, deterministic=True)
+    dbapi_connection.create_function('key_to_text', 1, _key_to_text, deterministic=True)
+    convert = 'key_to_blob' if storage == 'blob' else 'key_to_text'
+    source_type = 'text' if storage == 'blob' else 'blob'
+    
+    # Rewriting tasks.id must not be logged as task changes
+    for statement in task_changes.DROP_STATEMENTS:
+        connection.exec_driver_sql(statement)
+    
+    # Parent and child keys change in the same transaction
+    connection.exec_driver_sql('PRAGMA defer_foreign_keys = ON')
+    tables = set(inspect(connection).get_table_names())
+    converted = 0
+    for table, column in KEY_COLUMNS:
+        if table in tables:
+            result = connection.exec_driver_sql(
+                f'UPDATE {table} SET {column} = {convert}({column}) '
+                f"WHERE typeof({column}) = '{source_type}'"
+            )
+            converted += result.rowcount
+    
+    task_changes.create_change_triggers(connection)
+    return converted
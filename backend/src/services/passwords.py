@@ -0,0 +1,62 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordHashingBusy(Exception):
+    """Raised when no hashing slot frees up within PASSWORD_HASH_QUEUE_TIMEOUT."""
+
+# Per-process pool state, created on first use so each gunicorn worker gets its own
+_lock = threading.Lock()
+_pool = None
+_slots = None
+_method_prefixes = {}
+
+# start the worker pool and the semaphore bounding queued work
+def _get_pool(config):
+    global _pool, _slots
+    with _lock:
+        if _pool is None:
+            # forkserver children start clean instead of inheriting the
+            # request threads and open database connections of this worker
+            context = multiprocessing.get_context('forkserver')
+            _pool = ProcessPoolExecutor(max_workers=config['PASSWORD_HASH_WORKERS'], mp_context=context)
+            _slots = threading.BoundedSemaphore(config['PASSWORD_HASH_MAX_PENDING'])
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool, _slots
+
+# run a hashing function in the pool, or inline when the pool is disabled
+def _run(function, *args):
+    config = current_app.config
+    if not config['PASSWORD_HASH_WORKERS']:
+        return function(*args)
+    
+    pool, slots = _get_pool(config)
+    if not slots.acquire(timeout=config['PASSWORD_HASH_QUEUE_TIMEOUT']):
+        raise PasswordHashingBusy()
+    try:
+        future = pool.submit(function, *args)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future.result()
+
+# hash a password with the configured method
+def hash_password(password):
+    return _run(generate_password_hash, password, current_app.config['PASSWORD_HASH_METHOD'])
+
+# check a password against a stored hash
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
+
+# whether a stored hash was made with a different method or cost than configured
+def needs_rehash(password_hash):
+    method = current_app.config['PASSWORD_HASH_METHOD']
+    if method not in _method_prefixes:
+        # werkzeug expands defaults (e.g. 'scrypt' -> 'scrypt:32768:8:1'), so
+        # learn the stored prefix from one sample hash per configured method
+        _method_prefixes[method] = generate_password_hash('', method).split('$', 1)[0]
+    return password_hash.split('$', 1)[0] != _method_prefixes[method]
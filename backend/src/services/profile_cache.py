@@ -0,0 +1,36 @@
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models.user import User
+from services.cache import LRUTTLCache
+
+# Serialized User.to_dict() payloads keyed by user id, one cache per worker process.
+# Writes through the ORM invalidate entries on commit; other workers see a
+# change once their entry's TTL runs out.
+def init_profile_cache(app):
+    app.extensions['profile_cache'] = LRUTTLCache(
+        app.config['PROFILE_CACHE_SIZE'],
+        app.config['PROFILE_CACHE_TTL']
+    )
+
+def get_profile_cache():
+    return current_app.extensions['profile_cache']
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault('changed_user_ids', set())
+    for user in session.dirty | session.deleted:
+        if isinstance(user, User):
+            changed.add(user.id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    changed = session.info.pop('changed_user_ids', None)
+    if changed and has_app_context() and 'profile_cache' in current_app.extensions:
+        cache = get_profile_cache()
+        for user_id in changed:
+            cache.invalidate(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_user_ids', None)
@@ -0,0 +1,228 @@
+import contextvars
+import threading
+import time
+from flask import Response, current_app, g, request
+from sqlalchemy import event
+
+# Request latency buckets in seconds, and queries-per-request buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Most statements kept per request for the slow request log
+SLOW_LOG_MAX_STATEMENTS = 50
+
+# Timings of the request running in the current thread, None outside a request
+_current = contextvars.ContextVar('request_timings', default=None)
+
+class RequestTimings:
+    __slots__ = ('started', 'queries', 'sql_seconds', 'json_seconds', 'jwt_seconds', 'statements')
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.json_seconds = 0.0
+        self.jwt_seconds = 0.0
+        self.statements = []
+
+class Histogram:
+    """Cumulative bucket counts plus sum and count for one label set."""
+    
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+class MetricsRegistry:
+    """Per-process request metrics rendered in the Prometheus text format."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.durations = {}
+        self.query_counts = {}
+        self.queries = {}
+        self.sql_seconds = {}
+    
+    # record one finished request
+    def observe(self, method, endpoint, status, timings, duration):
+        key = (method, endpoint)
+        with self._lock:
+            status_key = (method, endpoint, str(status))
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            self.durations.setdefault(key, Histogram(DURATION_BUCKETS)).observe(duration)
+            self.query_counts.setdefault(key, Histogram(QUERY_BUCKETS)).observe(timings.queries)
+            self.queries[key] = self.queries.get(key, 0) + timings.queries
+            self.sql_seconds[key] = self.sql_seconds.get(key, 0.0) + timings.sql_seconds
+    
+    def render(self, profile_cache=None, group_commit=None):
+        lines = []
+        with self._lock:
+            render_counter(lines, 'http_requests_total', 'Requests by endpoint and status.',
+                           ('method', 'endpoint', 'status'), self.requests)
+            render_histogram(lines, 'http_request_duration_seconds', 'Request latency by endpoint.',
+                             self.durations)
+            render_histogram(lines, 'http_request_queries', 'SQL queries per request by endpoint.',
+                             self.query_counts)
+            render_counter(lines, 'db_queries_total', 'SQL queries executed by endpoint.',
+                           ('method', 'endpoint'), self.queries)
+            render_counter(lines, 'db_query_duration_seconds_total', 'Time spent in SQL by endpoint.',
+                           ('method', 'endpoint'), self.sql_seconds)
+        
+        if profile_cache is not None:
+            stats = profile_cache.stats()
+            for name in ('hits', 'misses', 'evictions', 'expirations'):
+                render_counter(lines, f'profile_cache_{name}_total', f'Profile cache {name}.',
+                               (), {(): stats[name]})
+            lines.append('# HELP profile_cache_entries Profiles currently cached.')
+            lines.append('# TYPE profile_cache_entries gauge')
+            lines.append(f"profile_cache_entries {stats['size']}")
+        
+        if group_commit is not None:
+            render_counter(lines, 'group_commit_transactions_total', 'Transactions committed by the group committer.',
+                           (), {(): group_commit.commits})
+            render_counter(lines, 'group_commit_writes_total', 'Task writes committed by the group committer.',
+                           (), {(): group_commit.writes})
+        return '\n'.join(lines) + '\n'
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(names, values, extra=''):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_counter(lines, name, help_text, label_names, values):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} counter')
+    for labels, value in sorted(values.items()):
+        lines.append(f'{name}{format_labels(label_names, labels)} {format_number(value)}')
+
+def render_histogram(lines, name, help_text, histograms):
+    label_names = ('method', 'endpoint')
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, histogram in sorted(histograms.items()):
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            le = format_labels(label_names, labels, f'le="{format_number(bound)}"')
+            lines.append(f'{name}_bucket{le} {count}')
+        inf = format_labels(label_names, labels, 'le="+Inf"')
+        lines.append(f'{name}_bucket{inf} {histogram.count}')
+        lines.append(f'{name}_sum{format_labels(label_names, labels)} {format_number(histogram.sum)}')
+        lines.append(f'{name}_count{format_labels(label_names, labels)} {histogram.count}')
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info['query_started'] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    started = conn.info.pop('query_started', None)
+    if timings is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    timings.queries += 1
+    timings.sql_seconds += elapsed
+    if len(timings.statements) < SLOW_LOG_MAX_STATEMENTS:
+        timings.statements.append((elapsed, statement))
+
+# time the SQL an engine runs for the request in progress
+def track_engine(engine):
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+# wrap a function so the time a request spends in it is added to one of
+# its timings (json_seconds, jwt_seconds)
+def _time_into(field, original):
+    def timed(*args, **kwargs):
+        timings = _current.get()
+        if timings is None:
+            return original(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            setattr(timings, field, getattr(timings, field) + time.perf_counter() - started)
+    return timed
+
+def _start_request():
+    g.request_timings_token = _current.set(RequestTimings())
+
+def _finish_request(response):
+    timings = _current.get()
+    if timings is None:
+        return response
+    duration = time.perf_counter() - timings.started
+    
+    sql_ms = timings.sql_seconds * 1000
+    json_ms = timings.json_seconds * 1000
+    jwt_ms = timings.jwt_seconds * 1000
+    total_ms = duration * 1000
+    response.headers.add('Server-Timing', ', '.join([
+        f'db;dur={sql_ms:.2f};desc="{timings.queries} queries"',
+        f'json;dur={json_ms:.2f}',
+        f'jwt;dur={jwt_ms:.2f}',
+        f'app;dur={max(total_ms - sql_ms - json_ms - jwt_ms, 0):.2f}',
+        f'total;dur={total_ms:.2f}',
+    ]))
+    
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    current_app.extensions['request_metrics'].observe(
+        request.method, endpoint, response.status_code, timings, duration)
+    
+    if total_ms >= current_app.config['SLOW_REQUEST_MS']:
+        statements = ''.join(f'\n  {elapsed * 1000:8.2f} ms  {statement}'
+                             for elapsed, statement in timings.statements)
+        current_app.logger.warning(
+            'Slow request %s %s -> %s in %.1f ms (%d queries, %.1f ms SQL)%s',
+            request.method, request.full_path.rstrip('?'), response.status_code,
+            total_ms, timings.queries, sql_ms, statements
+        )
+    return response
+
+def _end_request(error=None):
+    token = g.pop('request_timings_token', None)
+    if token is not None:
+        _current.reset(token)
+
+def metrics_view():
+    profile_cache = current_app.extensions.get('profile_cache')
+    group_commit = current_app.extensions.get('group_commit')
+    body = current_app.extensions['request_metrics'].render(profile_cache, group_commit)
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+# hook request timing into the app, its engines and its JWTManager when
+# REQUEST_METRICS is on; with it off nothing is registered, so requests pay
+# no extra cost
+def init_request_metrics(app, engines):
+    if not app.config['REQUEST_METRICS']:
+        return
+    
+    app.extensions['request_metrics'] = MetricsRegistry()
+    for engine in engines:
+        track_engine(engine)
+    
+    app.json.response = _time_into('json_seconds', app.json.response)
+    # Every token check (jwt_required, decode_token) decodes and verifies the
+    # token through this JWTManager method; it has no public hook for that
+    jwt_manager = app.extensions['flask-jwt-extended']
+    jwt_manager._decode_jwt_from_config = _time_into('jwt_seconds', jwt_manager._decode_jwt_from_config)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_end_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
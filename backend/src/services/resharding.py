@@ -0,0 +1,80 @@
+from models.keys import bytes_to_key
+from services.sharding import shard_index
+
+# Tables copied row by row into the user's new shard. The change log is not
+# copied: the target's triggers record every inserted task (and the FTS
+# triggers index it), with sequence numbers above any the sources handed out.
+COPIED_TABLES = ('tasks', 'task_stats', 'task_completion_rollups')
+
+# Rows read from a source per batch
+COPY_BATCH_SIZE = 1000
+
+# highest change-log sequence number a database has handed out, including
+# rows since replaced or pruned
+def last_change_seq(connection):
+    return connection.exec_driver_sql(
+        "SELECT max(coalesce((SELECT seq FROM sqlite_sequence WHERE name = 'task_changes'), 0), "
+        "coalesce((SELECT max(seq) FROM task_changes), 0), "
+        "coalesce((SELECT max(seq) FROM task_change_horizons), 0))"
+    ).scalar()
+
+# copy one table from a source into the targets, routing each row by user_id
+def copy_table(source, targets, table):
+    result = source.exec_driver_sql(f'SELECT * FROM {table} ORDER BY rowid')
+    columns = list(result.keys())
+    user_column = columns.index('user_id')
+    statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    
+    copied = [0] * len(targets)
+    for rows in result.partitions(COPY_BATCH_SIZE):
+        batches = [[] for _ in targets]
+        for row in rows:
+            batches[shard_index(bytes_to_key(row[user_column]), len(targets))].append(tuple(row))
+        for index, batch in enumerate(batches):
+            if batch:
+                targets[index].exec_driver_sql(statement, batch)
+                copied[index] += len(batch)
+    return copied
+
+# users with anything in a database's task tables, change log included
+def users_with_task_data(connection):
+    return [row[0] for row in connection.exec_driver_sql(
+        'SELECT user_id FROM tasks UNION SELECT user_id FROM task_stats '
+        'UNION SELECT user_id FROM task_completion_rollups '
+        'UNION SELECT user_id FROM task_changes UNION SELECT user_id FROM task_change_horizons'
+    )]
+
+# copy every user's task data from the source databases into a new set of
+# shards (one target connection per shard, schemas already migrated);
+# returns the number of tasks written to each target.
+#
+# Sequence numbers are per database, so a sync cursor from a source means
+# nothing in the target. Each target's log starts above every source's, and
+# each user gets a horizon there, so old cursors get 410 and clients do one
+# full resync instead of silently missing changes.
+def copy_to_shards(sources, targets):
+    floor = max(last_change_seq(source) for source in sources)
+    for target in targets:
+        target.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = 'task_changes'")
+        target.exec_driver_sql(
+            "INSERT INTO sqlite_sequence (name, seq) VALUES ('task_changes', ?)", (floor,)
+        )
+    
+    tasks = [0] * len(targets)
+    for source in sources:
+        for table in COPIED_TABLES:
+            copied = copy_table(source, targets, table)
+            if table == 'tasks':
+                tasks = [total + count for total, count in zip(tasks, copied)]
+        
+        horizons = [[] for _ in targets]
+        for user_id in users_with_task_data(source):
+            horizons[shard_index(bytes_to_key(user_id), len(targets))].append((user_id, floor + 1))
+        for index, rows in enumerate(horizons):
+            if rows:
+                targets[index].exec_driver_sql(
+                    'INSERT INTO task_change_horizons (user_id, seq) VALUES (?, ?) '
+                    'ON CONFLICT (user_id) DO UPDATE SET seq = max(seq, excluded.seq)',
+                    rows
+                )
+    return tasks
@@ -0,0 +1,112 @@
+import hashlib
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from flask import current_app, has_request_context
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+import sqlalchemy as sa
+
+# Tables whose rows belong to one user and live in that user's shard; every
+# other table (users) stays in the directory database. The FTS index and
+# triggers follow the tasks table. New per-user tables must be added here.
+SHARDED_TABLES = {'tasks', 'task_stats', 'task_changes', 'task_change_horizons', 'task_completion_rollups'}
+
+# Shard selected explicitly with use_shard(), for code running outside a
+# request (CLI commands, the event poller)
+_current_shard = ContextVar('current_shard', default=None)
+
+# stable shard number for a user id (the string form, as in the JWT
+# identity); the same on every worker and restart
+@lru_cache(maxsize=65536)
+def shard_index(user_id, count):
+    digest = hashlib.blake2b(user_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+# SQLAlchemy bind key of a shard's engine
+def shard_bind_key(index):
+    return f'shard-{index}'
+
+# absolute path of shard file `index` in a layout of `count` shards; the
+# count is part of the name so a reshard can write next to the live files
+def shard_path(app, index, count):
+    database = sa.engine.make_url(app.config['SQLALCHEMY_DATABASE_URI']).database
+    # Flask-SQLAlchemy resolves relative SQLite paths against the instance folder
+    database = os.path.join(app.instance_path, database)
+    directory = os.path.join(os.path.dirname(database), app.config['SHARD_DIR'])
+    return os.path.join(directory, f'tasks-{index}-of-{count}.db')
+
+# SQLALCHEMY_BINDS entries for the configured shards
+def shard_binds(app):
+    count = app.config['SHARD_COUNT']
+    if count:
+        os.makedirs(os.path.dirname(shard_path(app, 0, count)), exist_ok=True)
+    return {
+        shard_bind_key(index): f'sqlite:///{shard_path(app, index, count)}'
+        for index in range(count)
+    }
+
+# shard of a user under the current configuration, None when not sharding
+def user_shard(user_id):
+    count = current_app.config['SHARD_COUNT']
+    return shard_index(user_id, count) if count else None
+
+# route task queries to one shard for the duration of the block; None
+# (the unsharded layout) leaves routing unchanged
+@contextmanager
+def use_shard(index):
+    token = _current_shard.set(index)
+    try:
+        yield
+    finally:
+        _current_shard.reset(token)
+
+# (shard, engine) for every database holding tasks: each shard when sharding,
+# otherwise just the main database as shard None
+def task_engines():
+    engines = current_app.extensions['sqlalchemy'].engines
+    count = current_app.config['SHARD_COUNT']
+    if not count:
+        return [(None, engines[None])]
+    return [(index, engines[shard_bind_key(index)]) for index in range(count)]
+
+# shard for the current task query: the one chosen with use_shard(), else
+# the shard of the authenticated user
+def current_shard():
+    index = _current_shard.get()
+    if index is not None:
+        return index
+    if has_request_context():
+        try:
+            user_id = get_jwt_identity()
+        except RuntimeError:
+            user_id = None
+        if user_id is not None:
+            return user_shard(user_id)
+    raise RuntimeError('Task tables are sharded but no shard is selected; '
+                       'run the query in a JWT-protected request or inside use_shard()')
+
+class ShardedSession(Session):
+    """Session that sends queries on SHARDED_TABLES to the current shard.
+    
+    With SHARD_COUNT unset this is the plain Flask-SQLAlchemy session. Raw
+    SQL against task tables must pass bind_arguments={'mapper': ...} to be
+    routed, as the existing code already does.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._db.engines.get(shard_bind_key(0)) is not None:
+            # Core INSERT/UPDATE/DELETE statements arrive as the clause; route by their table
+            table = sa.inspect(mapper).local_table if mapper is not None else getattr(clause, 'table', clause)
+            if isinstance(table, sa.Table) and table.name in SHARDED_TABLES:
+                return self._db.engines[shard_bind_key(current_shard())]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+# create the schema in every shard, as db.create_all() does for the main
+# database; shards get the full schema so migrations run unchanged on them
+def create_shard_tables():
+    metadata = current_app.extensions['sqlalchemy'].metadata
+    for index, engine in task_engines():
+        if index is not None:
+            metadata.create_all(engine)
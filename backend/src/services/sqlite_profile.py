@@ -0,0 +1,51 @@
+from sqlalchemy import event
+
+# PRAGMA sets applied to every new SQLite connection, selected by SQLITE_PROFILE
+SQLITE_PROFILES = {
+    # SQLite's own defaults: rollback journal, synchronous=FULL, no busy handler
+    'default': {},
+    # WAL lets readers run alongside the single writer; synchronous=NORMAL is
+    # durable across application crashes and only fsyncs at checkpoints
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -65536,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+    },
+}
+
+# Config keys that override a single pragma of the selected profile
+PRAGMA_OVERRIDES = {
+    'journal_mode': 'SQLITE_JOURNAL_MODE',
+    'synchronous': 'SQLITE_SYNCHRONOUS',
+    'busy_timeout': 'SQLITE_BUSY_TIMEOUT_MS',
+    'cache_size': 'SQLITE_CACHE_SIZE',
+    'mmap_size': 'SQLITE_MMAP_SIZE',
+}
+
+# resolve the pragmas for the configured profile and overrides
+def sqlite_pragmas(config):
+    profile = config.get('SQLITE_PROFILE', 'default')
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f'Unknown SQLITE_PROFILE {profile!r}, expected one of {sorted(SQLITE_PROFILES)}')
+    
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for pragma, key in PRAGMA_OVERRIDES.items():
+        if config.get(key) is not None:
+            pragmas[pragma] = config[key]
+    return pragmas
+
+# run the profile's PRAGMAs whenever the engine opens a connection
+def apply_sqlite_profile(engine, config):
+    pragmas = sqlite_pragmas(config)
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+        cursor.close()
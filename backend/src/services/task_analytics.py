@@ -0,0 +1,151 @@
+from collections import Counter, defaultdict
+from sqlalchemy import cast, event, func, literal_column, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, attributes
+from models.task import Task
+from models.task_completion_rollup import TaskCompletionRollup
+from services.task_stats import PRIORITY_COLUMNS, committed_value
+
+# Bucket sizes accepted by the analytics endpoint
+INTERVALS = ('day', 'week')
+
+# whole seconds from creation to completion, the same figure as the
+# strftime('%s') difference rebuild_task_analytics uses
+def completion_seconds(created_at, completed_at):
+    if created_at is None:
+        return 0
+    return int((completed_at.replace(microsecond=0) - created_at.replace(microsecond=0)).total_seconds())
+
+# add or take back one completed task in a user's rollup deltas
+def count_completion(deltas, user_id, priority, created_at, completed_at, sign):
+    if completed_at is None:
+        return
+    counter = deltas[(user_id, completed_at.date(), priority)]
+    counter['completed'] += sign
+    counter['completion_seconds'] += sign * completion_seconds(created_at, completed_at)
+
+# work out how the rollups change for the tasks in a flush. Task.update_status
+# sets or clears completed_at; a completed task changing priority moves
+# between rollup rows, and deleting one takes it back out.
+def collect_rollup_deltas(session):
+    deltas = defaultdict(Counter)
+    
+    for task in session.new:
+        if isinstance(task, Task):
+            count_completion(deltas, task.user_id, task.priority, task.created_at, task.completed_at, 1)
+    
+    for task in session.deleted:
+        if isinstance(task, Task):
+            count_completion(deltas, committed_value(task, 'user_id'), committed_value(task, 'priority'),
+                             committed_value(task, 'created_at'), committed_value(task, 'completed_at'), -1)
+    
+    for task in session.dirty:
+        if not isinstance(task, Task):
+            continue
+        if any(attributes.get_history(task, key).has_changes() for key in ('completed_at', 'priority', 'user_id')):
+            count_completion(deltas, committed_value(task, 'user_id'), committed_value(task, 'priority'),
+                             committed_value(task, 'created_at'), committed_value(task, 'completed_at'), -1)
+            count_completion(deltas, task.user_id, task.priority, task.created_at, task.completed_at, 1)
+    
+    return deltas
+
+# add rollup deltas to task_completion_rollups, creating rows for new days
+def apply_rollup_deltas(connection, deltas):
+    rows = [
+        {'user_id': user_id, 'day': day, 'priority': priority,
+         'completed': counter['completed'], 'completion_seconds': counter['completion_seconds']}
+        for (user_id, day, priority), counter in deltas.items()
+        if any(counter.values())
+    ]
+    if not rows:
+        return
+    
+    table = TaskCompletionRollup.__table__
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day, table.c.priority],
+        set_={column: table.c[column] + statement.excluded[column] for column in ('completed', 'completion_seconds')}
+    )
+    connection.execute(statement, rows)
+
+# recompute every rollup row from the completed tasks in the tasks table
+def rebuild_task_analytics(connection):
+    table = TaskCompletionRollup.__table__
+    tasks = Task.__table__
+    
+    seconds = func.coalesce(
+        func.strftime('%s', tasks.c.completed_at) - func.strftime('%s', tasks.c.created_at), 0
+    )
+    rollups = select(
+        tasks.c.user_id,
+        func.date(tasks.c.completed_at),
+        tasks.c.priority,
+        func.count(),
+        cast(func.sum(seconds), table.c.completion_seconds.type)
+    ).where(tasks.c.completed_at.isnot(None)).group_by(
+        tasks.c.user_id, func.date(tasks.c.completed_at), tasks.c.priority
+    )
+    
+    connection.execute(table.delete())
+    connection.execute(insert(table).from_select(
+        ['user_id', 'day', 'priority', 'completed', 'completion_seconds'], rollups
+    ))
+
+# first day of the bucket a rollup day falls in; weeks start on Monday
+def period_column(interval):
+    day = TaskCompletionRollup.day
+    if interval == 'week':
+        return func.date(day, literal_column("'weekday 0'"), literal_column("'-6 days'"))
+    return day
+
+# rollup rows for one user between two dates (inclusive), summed per bucket and priority
+def completion_query(user_id, start, end, interval='day'):
+    period = period_column(interval).label('period')
+    return select(
+        period,
+        TaskCompletionRollup.priority,
+        func.sum(TaskCompletionRollup.completed).label('completed'),
+        func.sum(TaskCompletionRollup.completion_seconds).label('completion_seconds')
+    ).where(
+        TaskCompletionRollup.user_id == user_id,
+        TaskCompletionRollup.day >= start,
+        TaskCompletionRollup.day <= end
+    ).group_by(period, TaskCompletionRollup.priority).order_by(period)
+
+# average of a seconds total over a count, or None for no completions
+def average(seconds, count):
+    return round(seconds / count, 1) if count else None
+
+# completions per bucket, by priority, with average time to completion; only
+# buckets with completions are listed
+def summarize_completions(rows):
+    series = {}
+    totals = {'completed': 0, 'seconds': 0, 'byPriority': Counter()}
+    
+    for period, priority, completed, seconds in rows:
+        if not completed:
+            continue
+        period = period if isinstance(period, str) else period.isoformat()
+        bucket = series.setdefault(period, {'completed': 0, 'seconds': 0, 'byPriority': Counter()})
+        for summary in (bucket, totals):
+            summary['completed'] += completed
+            summary['seconds'] += seconds
+            summary['byPriority'][priority] += completed
+    
+    def to_dict(summary):
+        return {
+            'completed': summary['completed'],
+            'byPriority': {priority: summary['byPriority'][priority] for priority in PRIORITY_COLUMNS},
+            'averageCompletionSeconds': average(summary['seconds'], summary['completed'])
+        }
+    
+    return {
+        'series': [{'period': period, **to_dict(bucket)} for period, bucket in series.items()],
+        'totals': to_dict(totals)
+    }
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_task_rollups(session, flush_context):
+    deltas = collect_rollup_deltas(session)
+    if deltas:
+        apply_rollup_deltas(session.connection(bind_arguments={'mapper': TaskCompletionRollup.__mapper__}), deltas)
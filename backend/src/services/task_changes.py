@@ -0,0 +1,103 @@
+from collections import namedtuple
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert
+from database import db
+from models.task_change import TaskChange
+from models.task import Task
+from models.task_change_horizon import TaskChangeHorizon
+from services.task_rows import compile_task_mapper, task_columns
+
+# Triggers on tasks keep task_changes holding one row per task: INSERT OR
+# REPLACE drops the task's previous row and takes the next sequence number,
+# so the log stays as small as the task table plus its tombstones. They fire
+# for ORM writes, bulk imports and raw SQL alike. SQLite serializes writers,
+# so sequence numbers are handed out in commit order.
+CHANGE_TABLE = 'task_changes'
+
+CREATE_STATEMENTS = (
+    f"CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_ai AFTER INSERT ON tasks BEGIN "
+    f"INSERT OR REPLACE INTO {CHANGE_TABLE}(task_id, user_id, action, deleted, changed_at) "
+    "VALUES (new.id, new.user_id, 'create', 0, datetime('now')); END",
+    f"CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_au AFTER UPDATE ON tasks BEGIN "
+    f"INSERT OR REPLACE INTO {CHANGE_TABLE}(task_id, user_id, action, deleted, changed_at) "
+    "VALUES (new.id, new.user_id, 'update', 0, datetime('now')); END",
+    f"CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_ad AFTER DELETE ON tasks BEGIN "
+    f"INSERT OR REPLACE INTO {CHANGE_TABLE}(task_id, user_id, action, deleted, changed_at) "
+    "VALUES (old.id, old.user_id, 'delete', 1, datetime('now')); END",
+)
+
+DROP_STATEMENTS = (
+    f'DROP TRIGGER IF EXISTS {CHANGE_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {CHANGE_TABLE}_au',
+    f'DROP TRIGGER IF EXISTS {CHANGE_TABLE}_ai',
+)
+
+# One entry of the change log; task is the task's current to_dict(), or
+# None for a tombstone
+Change = namedtuple('Change', 'seq user_id task_id action task')
+
+# read up to limit changes after since in sequence order, for one user or
+# for everyone; tombstones can be left out for an initial sync
+def fetch_changes(session, since, limit, user_id=None, include_deleted=True):
+    query = session.query(
+        TaskChange.seq, TaskChange.user_id, TaskChange.task_id, TaskChange.action, TaskChange.deleted,
+        *task_columns()
+    ).outerjoin(Task, Task.id == TaskChange.task_id).filter(TaskChange.seq > since)
+    if user_id is not None:
+        query = query.filter(TaskChange.user_id == user_id)
+    if not include_deleted:
+        query = query.filter(TaskChange.deleted.is_(False))
+    
+    to_dict = compile_task_mapper()
+    changes = []
+    for seq, change_user_id, task_id, action, deleted, *task in query.order_by(TaskChange.seq).limit(limit):
+        if deleted or task[0] is None:
+            changes.append(Change(seq, change_user_id, task_id, 'delete', None))
+        else:
+            changes.append(Change(seq, change_user_id, task_id, action, to_dict(task)))
+    return changes
+
+# create the triggers that record task writes
+def create_change_triggers(connection):
+    for statement in CREATE_STATEMENTS:
+        connection.exec_driver_sql(statement)
+
+# re-record every existing task as changed, keeping tombstones; clients
+# holding an older cursor simply receive all tasks again
+def rebuild_change_log(connection):
+    for statement in DROP_STATEMENTS:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql(
+        f"INSERT OR REPLACE INTO {CHANGE_TABLE}(task_id, user_id, action, deleted, changed_at) "
+        "SELECT id, user_id, 'update', 0, datetime('now') FROM tasks ORDER BY created_at, id"
+    )
+    create_change_triggers(connection)
+
+# delete tombstones recorded before a cutoff and move each affected user's
+# horizon past them; returns the number of tombstones removed
+def prune_tombstones(connection, before):
+    table = TaskChange.__table__
+    horizons = select(table.c.user_id, db.func.max(table.c.seq).label('seq')).where(
+        table.c.deleted.is_(True), table.c.changed_at < before
+    ).group_by(table.c.user_id)
+    
+    rows = [{'user_id': user_id, 'seq': seq} for user_id, seq in connection.execute(horizons)]
+    if not rows:
+        return 0
+    
+    horizon_table = TaskChangeHorizon.__table__
+    statement = insert(horizon_table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[horizon_table.c.user_id],
+        set_={'seq': db.func.max(horizon_table.c.seq, statement.excluded.seq)}
+    )
+    connection.execute(statement, rows)
+    result = connection.execute(table.delete().where(
+        table.c.deleted.is_(True), table.c.changed_at < before
+    ))
+    return result.rowcount
+
+# tables are created in dependency order, so add the triggers once all exist
+@event.listens_for(db.metadata, 'after_create')
+def _create_change_triggers(target, connection, **kw):
+    create_change_triggers(connection)
@@ -0,0 +1,168 @@
+import asyncio
+import contextvars
+from collections import defaultdict, deque
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from models.task_change import TaskChange
+from services.task_changes import fetch_changes
+from services.sharding import user_shard
+
+# Changes read from the log per poll
+POLL_BATCH_SIZE = 500
+
+class Subscriber:
+    """Bounded buffer of changes for one SSE connection.
+    
+    When the client falls more than maxsize changes behind, the buffer is
+    dropped and the subscriber is marked overflowed; the stream then tells
+    the client to resync instead of silently skipping events.
+    """
+    
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.maxsize = maxsize
+        self.overflowed = False
+        self._changes = deque()
+        self._ready = asyncio.Event()
+    
+    # queue a change, or mark the subscriber overflowed when full
+    def put(self, change):
+        if self.overflowed:
+            return
+        if len(self._changes) >= self.maxsize:
+            self.overflowed = True
+            self._changes.clear()
+        else:
+            self._changes.append(change)
+        self._ready.set()
+    
+    # wait up to timeout seconds and return every queued change
+    async def drain(self, timeout):
+        if not self._changes and not self.overflowed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._ready.clear()
+        changes = list(self._changes)
+        self._changes.clear()
+        return changes
+
+class TaskEventBroker:
+    """Fans task changes out to the SSE streams of one ASGI worker process.
+    
+    A task on the event loop follows the task_changes log by sequence number
+    over aiosqlite, so writes committed by any worker (or by imports and
+    scripts) reach every stream within one poll interval. Commits made in
+    this process wake it straight away. The task only runs while someone is
+    subscribed, and a stream is a coroutine waiting on its subscriber, so an
+    open stream holds no thread. With sharding, each shard has its own log
+    and sequence numbers, so the position is tracked per shard.
+    """
+    
+    def __init__(self, app, async_db, poll_interval, buffer_size, max_subscribers):
+        self.app = app
+        self.async_db = async_db
+        self.poll_interval = poll_interval
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._subscribers = defaultdict(set)
+        self._count = 0
+        self._loop = None
+        self._wake = None
+        self._poller = None
+        self._last_seq = {}
+    
+    # register a subscriber for a user, or return None when this worker is full;
+    # every change committed after this call returns reaches the subscriber
+    async def subscribe(self, user_id):
+        if self._count >= self.max_subscribers:
+            return None
+        subscriber = Subscriber(user_id, self.buffer_size)
+        self._subscribers[user_id].add(subscriber)
+        self._count += 1
+        try:
+            shard = user_shard(user_id)
+            if shard not in self._last_seq:
+                async with self.async_db.shard_session(shard) as session:
+                    seq = await session.run_sync(latest_change_seq)
+                self._last_seq.setdefault(shard, seq)
+        except BaseException:
+            self.unsubscribe(subscriber)
+            raise
+        self._ensure_started()
+        return subscriber
+    
+    def unsubscribe(self, subscriber):
+        subscribers = self._subscribers.get(subscriber.user_id)
+        if subscribers and subscriber in subscribers:
+            subscribers.discard(subscriber)
+            self._count -= 1
+            if not subscribers:
+                del self._subscribers[subscriber.user_id]
+    
+    # poll the change log now instead of at the next interval; commits call
+    # this from the event loop and from the WSGI threads alike
+    def notify(self):
+        poller = self._poller
+        if self._count and poller is not None and not poller.done():
+            self._loop.call_soon_threadsafe(self._wake.set)
+    
+    # hand one change to every subscriber of its user
+    def publish(self, change):
+        for subscriber in self._subscribers.get(change.user_id, ()):
+            subscriber.put(change)
+    
+    # start the poller on the running loop unless it is already running
+    def _ensure_started(self):
+        if self._poller is not None and not self._poller.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        # A fresh context, so the poller doesn't keep the first subscriber's request
+        self._poller = self._loop.create_task(self._run(), context=contextvars.Context())
+    
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self._count:
+                # Start from the head of the log again once someone subscribes
+                self._last_seq = {}
+                return
+            try:
+                for shard, since in list(self._last_seq.items()):
+                    async with self.async_db.shard_session(shard) as session:
+                        changes = await session.run_sync(fetch_changes, since, POLL_BATCH_SIZE)
+                    for change in changes:
+                        self.publish(change)
+                        self._last_seq[shard] = change.seq
+            except Exception:
+                self.app.logger.exception('Failed to poll task changes')
+
+# highest sequence number in the change log, 0 when empty
+def latest_change_seq(session):
+    return session.query(func.coalesce(func.max(TaskChange.seq), 0)).scalar()
+
+# called by the ASGI entry point; the WSGI app has no open streams to feed
+def init_task_events(app, async_db):
+    app.extensions['task_events'] = TaskEventBroker(
+        app,
+        async_db,
+        app.config['EVENTS_POLL_INTERVAL'],
+        app.config['EVENTS_BUFFER_SIZE'],
+        app.config['EVENTS_MAX_CONNECTIONS']
+    )
+    return app.extensions['task_events']
+
+def get_task_events():
+    return current_app.extensions['task_events']
+
+@event.listens_for(Session, 'after_commit')
+def _wake_task_events(session):
+    if has_app_context() and 'task_events' in current_app.extensions:
+        get_task_events().notify()
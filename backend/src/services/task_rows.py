@@ -0,0 +1,70 @@
+from functools import lru_cache
+from sqlalchemy import String, type_coerce
+from models.task import Task
+
+# API field name -> column, in the order of Task.to_dict()
+TASK_FIELDS = {
+    'id': Task.id,
+    'title': Task.title,
+    'description': Task.description,
+    'priority': Task.priority,
+    'status': Task.status,
+    'dueDate': Task.due_date,
+    'completedAt': Task.completed_at,
+    'userId': Task.user_id,
+    'createdAt': Task.created_at,
+    'updatedAt': Task.updated_at
+}
+ALL_TASK_FIELDS = tuple(TASK_FIELDS)
+DATETIME_FIELDS = {'dueDate', 'completedAt', 'createdAt', 'updatedAt'}
+
+# convert SQLite's stored 'YYYY-MM-DD HH:MM:SS.ffffff' text straight to
+# the string datetime.isoformat() would give, without building a datetime
+def sqlite_datetime_to_iso(value):
+    if value is None:
+        return None
+    value = value.replace(' ', 'T', 1)
+    if value[19:] == '.000000':
+        return value[:19]
+    return value
+
+# columns to select for the given fields; datetimes come back as raw text
+def task_columns(fields=ALL_TASK_FIELDS):
+    return [
+        type_coerce(TASK_FIELDS[field], String).label(field) if field in DATETIME_FIELDS
+        else TASK_FIELDS[field]
+        for field in fields
+    ]
+
+# build (once per field list) a function mapping a selected row to the
+# same dict Task.to_dict() returns for those fields. zip() stops at the
+# last field, so extra columns selected after them are ignored.
+@lru_cache(maxsize=128)
+def compile_task_mapper(fields=ALL_TASK_FIELDS):
+    datetime_fields = tuple(field for field in fields if field in DATETIME_FIELDS)
+    
+    def map_task_row(row):
+        task = dict(zip(fields, row))
+        for field in datetime_fields:
+            task[field] = sqlite_datetime_to_iso(task[field])
+        return task
+    
+    return map_task_row
+
+# parse a fields=title,status,dueDate parameter into a field list in
+# to_dict() order; id is always included. Raises ValueError naming any
+# unknown fields.
+def parse_fields(value):
+    if not value:
+        return ALL_TASK_FIELDS
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = sorted(requested - set(TASK_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    requested.add('id')
+    return tuple(field for field in ALL_TASK_FIELDS if field in requested)
+
+# fields to select: the requested ones first (which is all the mapper for
+# `fields` reads), then any the endpoint needs itself, such as cursor columns
+def select_fields(fields, *required):
+    return fields + tuple(field for field in required if field not in fields)
@@ -0,0 +1,111 @@
+import re
+import weakref
+from sqlalchemy import column, event, literal_column, table, text
+from sqlalchemy.exc import OperationalError
+from models.task import Task
+
+# FTS5 shadow index over tasks.title/description. Its rowid mirrors
+# tasks.rowid, and triggers keep it in sync inside the writing transaction.
+# VACUUM may renumber tasks.rowid, so run `flask rebuild-search-index`
+# after vacuuming the database. Each entry also holds its owner's id as a
+# single token, the UUID's 32 hex digits whether keys are stored as text or
+# as blobs. Every search matches on it, so FTS5 only walks the caller's
+# entries instead of every user's matches.
+FTS_TABLE = 'tasks_fts'
+
+tasks_fts = table(FTS_TABLE, column('rowid'), column('rank'))
+
+# SQL giving the owner token of a user id column
+def owner_sql(user_id):
+    return (
+        f"CASE WHEN typeof({user_id}) = 'blob' AND length({user_id}) = 16 THEN hex({user_id}) "
+        f"ELSE replace(CAST({user_id} AS TEXT), '-', '') END"
+    )
+
+CREATE_STATEMENTS = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, description, owner, tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description, owner) "
+    f"VALUES (new.rowid, new.title, coalesce(new.description, ''), {owner_sql('new.user_id')}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON tasks BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.rowid; END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description, user_id ON tasks BEGIN "
+    f"UPDATE {FTS_TABLE} SET title = new.title, description = coalesce(new.description, ''), "
+    f"owner = {owner_sql('new.user_id')} WHERE rowid = old.rowid; END",
+)
+
+DROP_STATEMENTS = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+# Whether each engine's database has the FTS index, checked once per engine
+_available = weakref.WeakKeyDictionary()
+
+# create the FTS table and its triggers, returning False if FTS5 is missing
+def create_search_index(connection):
+    try:
+        with connection.begin_nested():
+            for statement in CREATE_STATEMENTS:
+                connection.exec_driver_sql(statement)
+    except OperationalError:
+        return False
+    return True
+
+# drop and repopulate the FTS index from the tasks table
+def rebuild_search_index(connection):
+    for statement in DROP_STATEMENTS:
+        connection.exec_driver_sql(statement)
+    if not create_search_index(connection):
+        return False
+    connection.exec_driver_sql(
+        f"INSERT INTO {FTS_TABLE}(rowid, title, description, owner) "
+        f"SELECT rowid, title, coalesce(description, ''), {owner_sql('user_id')} FROM tasks"
+    )
+    return True
+
+@event.listens_for(Task.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    _available[connection.engine] = create_search_index(connection)
+
+# check whether the database behind a session has the FTS index
+def search_index_available(session):
+    engine = session.get_bind(mapper=Task.__mapper__)
+    if engine not in _available:
+        exists = session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE},
+            bind_arguments={'mapper': Task.__mapper__}
+        ).first()
+        _available[engine] = exists is not None
+    return _available[engine]
+
+# FTS5 query term matching the entries of one user's tasks
+def owner_filter(user_id):
+    owner = str(user_id).replace('-', '').replace('"', '""')
+    return f'owner : "{owner}"'
+
+# turn free text into an FTS5 query matching every word as a prefix in the
+# title or description of one user's tasks
+def build_match_query(search, user_id):
+    words = re.findall(r'\w+', search)
+    if not words:
+        return ''
+    prefixes = ' '.join(f'"{word}"*' for word in words)
+    return f'{owner_filter(user_id)} AND {{title description}} : ({prefixes})'
+
+# restrict one user's Task query to full-text matches, or return None to fall back
+def apply_search(query, search, user_id):
+    match = build_match_query(search, user_id)
+    if not match or not search_index_available(query.session):
+        return None
+    return query.join(tasks_fts, tasks_fts.c.rowid == literal_column('tasks.rowid')).filter(
+        literal_column(FTS_TABLE).op('MATCH')(match)
+    )
+
+# ordering expression for the best matches first (bm25 rank)
+def rank_order():
+    return tasks_fts.c.rank
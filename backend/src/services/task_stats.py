@@ -0,0 +1,109 @@
+from collections import Counter, defaultdict
+from sqlalchemy import event, func, literal, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, attributes
+from models.task import Task
+from models.task_stats import TaskStats
+
+# Counter columns on task_stats for each status and priority value
+STATUS_COLUMNS = {'pending': 'pending', 'in-progress': 'in_progress', 'completed': 'completed'}
+PRIORITY_COLUMNS = {'low': 'low', 'medium': 'medium', 'high': 'high'}
+COUNTER_COLUMNS = tuple(STATUS_COLUMNS.values()) + tuple(PRIORITY_COLUMNS.values())
+DELTA_COLUMNS = COUNTER_COLUMNS + ('version',)
+
+# value of a task attribute as it was last loaded from the database
+def committed_value(task, key):
+    history = attributes.get_history(task, key)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return history.added[0] if history.added else None
+
+# add the counters for one status/priority pair to a user's deltas
+def count_task(deltas, user_id, status, priority, sign):
+    if status in STATUS_COLUMNS:
+        deltas[user_id][STATUS_COLUMNS[status]] += sign
+    if priority in PRIORITY_COLUMNS:
+        deltas[user_id][PRIORITY_COLUMNS[priority]] += sign
+
+# work out how each user's counters and version change for the tasks in a flush
+def collect_stats_deltas(session):
+    deltas = defaultdict(Counter)
+    
+    for task in session.new:
+        if isinstance(task, Task):
+            count_task(deltas, task.user_id, task.status, task.priority, 1)
+            deltas[task.user_id]['version'] = 1
+    
+    for task in session.deleted:
+        if isinstance(task, Task):
+            user_id = committed_value(task, 'user_id')
+            count_task(deltas, user_id, committed_value(task, 'status'), committed_value(task, 'priority'), -1)
+            deltas[user_id]['version'] = 1
+    
+    for task in session.dirty:
+        if isinstance(task, Task) and session.is_modified(task):
+            status = attributes.get_history(task, 'status')
+            priority = attributes.get_history(task, 'priority')
+            if status.has_changes() or priority.has_changes():
+                count_task(deltas, committed_value(task, 'user_id'),
+                       committed_value(task, 'status'), committed_value(task, 'priority'), -1)
+                count_task(deltas, task.user_id, task.status, task.priority, 1)
+            deltas[task.user_id]['version'] = 1
+    
+    return deltas
+
+# add counter deltas to task_stats rows, creating rows for new users
+def apply_stats_deltas(connection, deltas):
+    rows = [
+        {'user_id': user_id, **{column: counter.get(column, 0) for column in DELTA_COLUMNS}}
+        for user_id, counter in deltas.items()
+        if any(counter.values())
+    ]
+    if not rows:
+        return
+    
+    table = TaskStats.__table__
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={column: table.c[column] + statement.excluded[column] for column in DELTA_COLUMNS}
+    )
+    connection.execute(statement, rows)
+
+# recompute every user's counters from the tasks table. A rebuild follows
+# writes the listeners didn't see, so every existing row gets a new version,
+# users who no longer have tasks included, and new rows start at 1, above
+# the 0 reported for users without a row; no ETag from before still matches.
+def rebuild_task_stats(connection):
+    table = TaskStats.__table__
+    tasks = Task.__table__
+    
+    def count_where(column, value):
+        return func.sum((column == value).cast(table.c.pending.type))
+    
+    counts = select(
+        tasks.c.user_id,
+        *[count_where(tasks.c.status, status).label(column) for status, column in STATUS_COLUMNS.items()],
+        *[count_where(tasks.c.priority, priority).label(column) for priority, column in PRIORITY_COLUMNS.items()],
+        literal(1, table.c.version.type).label('version')
+    ).group_by(tasks.c.user_id)
+    
+    connection.execute(table.update().values({
+        **{column: 0 for column in COUNTER_COLUMNS},
+        'version': table.c.version + 1
+    }))
+    
+    statement = insert(table).from_select(['user_id', *COUNTER_COLUMNS, 'version'], counts)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={column: statement.excluded[column] for column in COUNTER_COLUMNS}
+    )
+    connection.execute(statement)
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_task_stats(session, flush_context):
+    deltas = collect_stats_deltas(session)
+    if deltas:
+        apply_stats_deltas(session.connection(bind_arguments={'mapper': TaskStats.__mapper__}), deltas)
@@ -0,0 +1,173 @@
+import calendar
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import delete, event, inspect, select
+from sqlalchemy.orm import Session
+from database import db
+from models.revoked_token import RevokedToken
+from models.user import User
+
+# Revoked JWTs, checked on every authenticated request. Each worker keeps the
+# revoked_tokens table in memory: jtis in a dict and per-user "issued at or
+# before" cutoffs in another, so a check is two dict lookups. Rows committed
+# by this worker are added on commit; rows from other workers, imports or the
+# CLI are picked up by a refresh that reads only rows with a higher id than
+# the last one seen, at most once every TOKEN_REVOCATION_REFRESH_INTERVAL
+# seconds.
+
+# a revoked_tokens row as captured at flush time
+Revocation = namedtuple('Revocation', 'id jti user_id revoked_at expires_at')
+
+# Unix seconds of a naive UTC datetime, comparable with the iat/exp claims
+def to_timestamp(value):
+    return calendar.timegm(value.utctimetuple())
+
+# In-memory copy of the revoked_tokens table for one worker process
+class RevocationList:
+    def __init__(self, refresh_interval, clock=time.monotonic):
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._jtis = {}
+        self._cutoffs = {}
+        self._last_id = 0
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+    
+    # True if the decoded token was revoked by jti or by a user-wide cutoff
+    def is_revoked(self, jwt_payload, identity_claim='sub'):
+        if self.refresh_due():
+            self.refresh()
+        
+        if jwt_payload.get('jti') in self._jtis:
+            return True
+        # iat is in whole seconds, so a token issued in the same second as a
+        # user-wide revocation can't be told apart from one issued just
+        # before it; both count as revoked
+        cutoff = self._cutoffs.get(jwt_payload.get(identity_claim))
+        return cutoff is not None and jwt_payload.get('iat', 0) <= cutoff[0]
+    
+    # whether the copy was never loaded or is older than the refresh interval
+    def refresh_due(self):
+        refreshed_at = self._refreshed_at
+        return refreshed_at is None or self._clock() - refreshed_at >= self.refresh_interval
+    
+    # read rows added since the last refresh. Only one thread queries at a
+    # time; the others keep using the current copy instead of waiting, except
+    # before the first load.
+    def refresh(self):
+        if not self._refresh_lock.acquire(blocking=self._refreshed_at is None):
+            return
+        try:
+            table = RevokedToken.__table__
+            with db.engine.connect() as connection:
+                rows = connection.execute(
+                    select(table).where(table.c.id > self._last_id).order_by(table.c.id)
+                ).all()
+            self.add(rows)
+            if rows:
+                self._last_id = rows[-1].id
+            self.prune()
+            self._refreshed_at = self._clock()
+        finally:
+            self._refresh_lock.release()
+    
+    # apply revoked_tokens rows to the copy. Only refresh() moves the last
+    # seen id on, so rows committed earlier by other workers aren't skipped
+    # when this worker's own later row is added first.
+    def add(self, rows):
+        now = time.time()
+        with self._lock:
+            for row in rows:
+                expires_at = to_timestamp(row.expires_at)
+                if expires_at <= now:
+                    continue
+                if row.jti:
+                    self._jtis[row.jti] = expires_at
+                    continue
+                cutoff = to_timestamp(row.revoked_at)
+                current = self._cutoffs.get(row.user_id)
+                if current is None or current[0] < cutoff:
+                    self._cutoffs[row.user_id] = (cutoff, expires_at)
+    
+    # forget entries whose tokens have expired on their own
+    def prune(self):
+        now = time.time()
+        with self._lock:
+            self._jtis = {jti: expires for jti, expires in self._jtis.items() if expires > now}
+            self._cutoffs = {user_id: cutoff for user_id, cutoff in self._cutoffs.items() if cutoff[1] > now}
+    
+    def __len__(self):
+        return len(self._jtis) + len(self._cutoffs)
+
+def init_token_revocation(app, jwt):
+    app.extensions['token_revocation'] = RevocationList(app.config['TOKEN_REVOCATION_REFRESH_INTERVAL'])
+    identity_claim = app.config['JWT_IDENTITY_CLAIM']
+    
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        # Tokens issued while JWT_ACCESS_TOKEN_EXPIRES was off never expire
+        if 'exp' not in jwt_payload:
+            return True
+        return get_revocation_list().is_revoked(jwt_payload, identity_claim)
+
+def get_revocation_list():
+    return current_app.extensions['token_revocation']
+
+# longest a token can live, so a user-wide cutoff can be dropped after it
+def longest_token_lifetime():
+    config = current_app.config
+    lifetimes = [config['JWT_ACCESS_TOKEN_EXPIRES'], config['JWT_REFRESH_TOKEN_EXPIRES']]
+    return max(lifetime for lifetime in lifetimes if lifetime)
+
+# revoke one decoded token; committed with the caller's session
+def revoke_token(jwt_payload):
+    db.session.add(RevokedToken(
+        jti=jwt_payload['jti'],
+        user_id=jwt_payload[current_app.config['JWT_IDENTITY_CLAIM']],
+        revoked_at=datetime.utcnow(),
+        expires_at=datetime.utcfromtimestamp(jwt_payload['exp'])
+    ))
+
+# revoke every token issued to a user so far
+def revoke_user_tokens(session, user_id):
+    now = datetime.utcnow()
+    session.add(RevokedToken(user_id=user_id, revoked_at=now, expires_at=now + longest_token_lifetime()))
+
+# delete rows whose tokens have all expired
+def prune_revoked_tokens(connection):
+    table = RevokedToken.__table__
+    return connection.execute(delete(table).where(table.c.expires_at <= datetime.utcnow())).rowcount
+
+# Deactivating a user revokes their tokens in the same transaction
+@event.listens_for(Session, 'before_flush')
+def _revoke_deactivated_users(session, flush_context, instances):
+    for user in list(session.dirty):
+        if not isinstance(user, User):
+            continue
+        history = inspect(user).attrs.is_active.history
+        if history.added and history.added[0] is False and history.deleted and history.deleted[0] is not False:
+            revoke_user_tokens(session, user.id)
+
+@event.listens_for(Session, 'after_flush')
+def _collect_revocations(session, flush_context):
+    revoked = [
+        Revocation(row.id, row.jti, row.user_id, row.revoked_at, row.expires_at)
+        for row in session.new if isinstance(row, RevokedToken)
+    ]
+    if revoked:
+        session.info.setdefault('revoked_tokens', []).extend(revoked)
+
+# Revocations committed by this worker apply to its next request
+@event.listens_for(Session, 'after_commit')
+def _apply_revocations(session):
+    revoked = session.info.pop('revoked_tokens', None)
+    if revoked and has_app_context() and 'token_revocation' in current_app.extensions:
+        get_revocation_list().add(revoked)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_revocations(session):
+    session.info.pop('revoked_tokens', None)
@@ -16,6 +16,48 @@ export const AuthProvider = ({ children }) => {
   const [loading, setLoading] = useState(true);
   const [token, setToken] = useState(localStorage.getItem('token'));
 
+  // Access tokens are short-lived: on a 401, trade the refresh token for a
+  // new access token once and retry the request
+  useEffect(() => {
+    const interceptor = axios.interceptors.response.use(
+      (response) => response,
+      async (error) => {
+        const original = error.config;
+        const refreshToken = localStorage.getItem('refreshToken');
+        if (
+          error.response?.status !== 401 ||
+          !refreshToken ||
+          !original ||
+          original._retried ||
+          ['/api/auth/login', '/api/auth/register', '/api/auth/refresh', '/api/auth/logout'].includes(original.url)
+        ) {
+          return Promise.reject(error);
+        }
+
+        original._retried = true;
+        try {
+          const response = await axios.post('/api/auth/refresh', null, {
+            headers: { Authorization: `Bearer ${refreshToken}` }
+          });
+          const newToken = response.data.data.token;
+          localStorage.setItem('token', newToken);
+          setToken(newToken);
+          original.headers = { ...original.headers, Authorization: `Bearer ${newToken}` };
+          return axios(original);
+        } catch (refreshError) {
+          // Refresh token expired or revoked: sign out
+          localStorage.removeItem('token');
+          localStorage.removeItem('refreshToken');
+          setToken(null);
+          setUser(null);
+          return Promise.reject(error);
+        }
+      }
+    );
+
+    return () => axios.interceptors.response.eject(interceptor);
+  }, []);
+
   // Configure axios defaults
   useEffect(() => {
     if (token) {
@@ -33,10 +75,12 @@ export const AuthProvider = ({ children }) => {
         try {
           const response = await axios.get('/api/auth/profile');
           setUser(response.data.data.user);
-          setToken(storedToken);
+          // The request may have refreshed the stored token
+          setToken(localStorage.getItem('token'));
         } catch (error) {
           console.error('Auth check failed:', error);
           localStorage.removeItem('token');
+          localStorage.removeItem('refreshToken');
           setToken(null);
         }
       }
@@ -53,9 +97,10 @@ export const AuthProvider = ({ children }) => {
         password
       });
 
-      const { token: newToken, user: userData } = response.data.data;
+      const { token: newToken, refreshToken, user: userData } = response.data.data;
       
       localStorage.setItem('token', newToken);
+      localStorage.setItem('refreshToken', refreshToken);
       setToken(newToken);
       setUser(userData);
       
@@ -73,9 +118,10 @@ export const AuthProvider = ({ children }) => {
     try {
       const response = await axios.post('/api/auth/register', userData);
       
-      const { token: newToken, user: newUser } = response.data.data;
+      const { token: newToken, refreshToken, user: newUser } = response.data.data;
       
       localStorage.setItem('token', newToken);
+      localStorage.setItem('refreshToken', refreshToken);
       setToken(newToken);
       setUser(newUser);
       
@@ -91,7 +137,15 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    // Revoke both tokens on the server; sign out locally either way
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (token) {
+      axios.post('/api/auth/logout', { refreshToken }, {
+        headers: { Authorization: `Bearer ${token}` }
+      }).catch(() => {});
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     setToken(null);
     setUser(null);
     delete axios.defaults.headers.common['Authorization'];